@@ -2,6 +2,12 @@ import threading
 
 from os import path
 
+try:
+    from contextvars import ContextVar
+except ImportError:
+    # Python 3.6. thread_env falls back to a threading.local.
+    ContextVar = None
+
 
 version = '1.0 alpha'
 release = '1.0.0a22'
@@ -19,6 +25,51 @@ referenced or copied with a known path relative to the package root.
 class Env:
     pass
 
+
+class ContextEnv:
+    """
+    Context-local attribute bucket.
+
+    Each attribute is backed by a :py:class:`contextvars.ContextVar`, which
+    makes values local to the running thread as well as to the running
+    asyncio task, as opposed to :py:class:`threading.local` which is only
+    thread-aware. Attributes are set, read and deleted like on a regular
+    object.
+    """
+    __slots__ = ('_vars',)
+
+    _unset = object()
+
+    def __init__(self):
+        object.__setattr__(self, '_vars', {})
+
+
+    def __getattr__(self, name):
+        try:
+            val = self._vars[name].get(self._unset)
+        except KeyError:
+            val = self._unset
+        if val is self._unset:
+            raise AttributeError(name)
+
+        return val
+
+
+    def __setattr__(self, name, value):
+        try:
+            var = self._vars[name]
+        except KeyError:
+            var = self._vars.setdefault(name, ContextVar(name))
+        var.set(value)
+
+
+    def __delattr__(self, name):
+        # A ContextVar cannot be unset without a token; setting the sentinel
+        # makes the attribute disappear for the current context.
+        getattr(self, name)
+        self._vars[name].set(self._unset)
+
+
 env = Env()
 """
 A pox on "globals are evil".
@@ -42,12 +93,13 @@ This is automated in non-test environments by importing
 :rtype: Object
 """
 
-thread_env = threading.local()
+thread_env = ContextEnv() if ContextVar else threading.local()
 """
-Thread-local environment.
+Context-local environment.
 
-This is used to store thread-specific variables such as start/end request
-timestamps.
+This is used to store thread- or task-specific variables such as start/end
+request timestamps. On Python versions without :py:mod:`contextvars`, this is
+a :py:class:`threading.local` and values are only thread-local.
 
-:rtype: threading.local
+:rtype: ContextEnv or threading.local
 """
@@ -17,6 +17,9 @@ This module contains maintenance utilities and stats.
 
 logger = logging.getLogger(__name__)
 
+FIXITY_BUFSIZE = 65536
+"""Chunk size, in bytes, used to read binary content for fixity checks."""
+
 
 def stats():
     """
@@ -95,7 +98,12 @@ def fixity_check(uid):
         ref_cksum = ref_digest_parts[-1]
         ref_cksum_algo = ref_digest_parts[-2]
 
-        calc_cksum = hashlib.new(ref_cksum_algo, rsrc.content.read()).hexdigest()
+        # Hash the content in chunks rather than reading it all in memory.
+        calc_hash = hashlib.new(ref_cksum_algo)
+        with rsrc.content as fh:
+            for buf in iter(lambda: fh.read(FIXITY_BUFSIZE), b''):
+                calc_hash.update(buf)
+        calc_cksum = calc_hash.hexdigest()
 
     if calc_cksum != ref_cksum:
         raise ChecksumValidationError(uid, ref_cksum, calc_cksum)
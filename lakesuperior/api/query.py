@@ -93,7 +93,7 @@ def term_query(terms, or_logic=False):
       {}
     }}
     '''.format(qry_terms)
-    logger.debug('Query: {}'.format(qry_str))
+    logger.debug('Query: %s', qry_str)
 
     with rdf_store.txn_ctx():
         qres = rdfly.raw_query(qry_str)
@@ -1,9 +1,8 @@
 import logging
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
-from itertools import groupby
-from multiprocessing import Process
-from threading import Lock, Thread
 
 import arrow
 
@@ -16,13 +15,19 @@ from lakesuperior.exceptions import (
         InvalidResourceError, ResourceNotExistsError, TombstoneError)
 from lakesuperior import env, thread_env
 from lakesuperior.globals import RES_DELETED, RES_UPDATED
-from lakesuperior.model.ldp.ldp_factory import LDP_NR_TYPE, LdpFactory
-from lakesuperior.model.ldp.ldpr import Ldpr
+from lakesuperior.model.ldp.ldp_factory import (
+        DEF_METADATA_CACHE_SIZE, LDP_NR_TYPE, LdpFactory)
+from lakesuperior.model.ldp.ldpr import Ldpr, _ref_int
 from lakesuperior.util.toolbox import rel_uri_to_urn
 
 
 logger = logging.getLogger(__name__)
 
+# Single, long-lived worker that sends out change messages. Having only one
+# worker guarantees that the changelog is processed in order.
+_msg_executor = ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix='lsup_messaging')
+
 __doc__ = """
 Primary API for resource manipulation.
 
@@ -78,11 +83,33 @@ def transaction(write=False):
             thread_env.timestamp = arrow.utcnow()
             thread_env.timestamp_term = Literal(
                     thread_env.timestamp, datatype=XSD.dateTime)
-            with env.app_globals.rdf_store.txn_ctx(write):
-                ret = fn(*args, **kwargs)
+            # Request-scoped caches of resource metadata and existence, and
+            # buffer of change messages. Nested transactions share the
+            # outermost ones.
+            own_cache = not hasattr(thread_env, 'metadata_cache')
+            if own_cache:
+                thread_env.metadata_cache = OrderedDict()
+                thread_env.metadata_cache_size = (
+                        env.app_globals.config['application']['store']
+                        ['ldp_rs'].get(
+                            'metadata_cache_size', DEF_METADATA_CACHE_SIZE))
+                thread_env.exists_cache = {}
+                thread_env.changelog_buffer = []
+            try:
+                with env.app_globals.rdf_store.txn_ctx(write):
+                    ret = fn(*args, **kwargs)
+                if own_cache:
+                    # Only publish changes once they are committed.
+                    env.app_globals.changelog.extend(
+                            thread_env.changelog_buffer)
+            finally:
+                if own_cache:
+                    delattr(thread_env, 'metadata_cache')
+                    delattr(thread_env, 'metadata_cache_size')
+                    delattr(thread_env, 'exists_cache')
+                    delattr(thread_env, 'changelog_buffer')
             if len(env.app_globals.changelog):
-                job = Thread(target=_process_queue)
-                job.start()
+                _msg_executor.submit(_process_queue)
             delattr(thread_env, 'timestamp')
             delattr(thread_env, 'timestamp_term')
             return ret
@@ -92,13 +119,14 @@ def transaction(write=False):
 
 def _process_queue():
     """
-    Process the message queue on a separate thread.
+    Process the message queue on the messaging worker thread.
     """
-    lock = Lock()
-    lock.acquire()
     while len(env.app_globals.changelog):
-        _send_event_msg(*env.app_globals.changelog.popleft())
-    lock.release()
+        try:
+            _send_event_msg(*env.app_globals.changelog.popleft())
+        except Exception:
+            # The executor would silently store the exception in the future.
+            logger.exception('Error sending change message.')
 
 
 def _send_event_msg(remove_trp, add_trp, metadata):
@@ -110,16 +138,11 @@ def _send_event_msg(remove_trp, add_trp, metadata):
     method groups triples by subject and sends a message for each of the
     subjects found.
     """
-    # Group delta triples by subject.
-    remove_grp = groupby(remove_trp, lambda x : x[0])
-    remove_dict = {k[0]: k[1] for k in remove_grp}
-
-    add_grp = groupby(add_trp, lambda x : x[0])
-    add_dict = {k[0]: k[1] for k in add_grp}
-
-    subjects = set(remove_dict.keys()) | set(add_dict.keys())
+    # Only the distinct subjects are needed, not the triples grouped by them.
+    subjects = {trp[0] for trp in remove_trp}
+    subjects.update(trp[0] for trp in add_trp)
     for rsrc_uri in subjects:
-        logger.debug('Processing event for subject: {}'.format(rsrc_uri))
+        logger.debug('Processing event for subject: %s', rsrc_uri)
         env.app_globals.messenger.send(rsrc_uri, **metadata)
 
 
@@ -212,7 +235,7 @@ def create(parent, slug=None, **kwargs):
         2. Resource (lakesuperior.model.ldp.ldpr.Ldpr): The new or updated resource.
     """
     uid = LdpFactory.mint_uid(parent, slug)
-    logger.debug('Minted UID for new resource: {}'.format(uid))
+    logger.debug('Minted UID for new resource: %s', uid)
     rsrc = LdpFactory.from_provided(uid, **kwargs)
 
     rsrc.create_or_replace(create_only=True)
@@ -241,7 +264,8 @@ def create_or_replace(uid, **kwargs):
 
 
 @transaction(True)
-def update(uid, update_str, is_metadata=False, handling='strict'):
+def update(
+        uid, update_str, is_metadata=False, handling='strict', bindings=None):
     """
     Update a resource with a SPARQL-Update string.
 
@@ -252,16 +276,53 @@ def update(uid, update_str, is_metadata=False, handling='strict'):
         (the default) rejects the update with an exception if server-managed
         triples are being changed. ``lenient`` modifies the update graph so
         offending triples are removed and the update can be applied.
+    :param dict bindings: Variable bindings for ``update_str``, as a map of
+        variable names to RDFLib terms. See
+        :py:meth:`lakesuperior.model.ldp.ldpr.Ldpr.sparql_delta`.
 
     :raise InvalidResourceError: If ``is_metadata`` is False and the resource
         being updated is a LDP-NR.
     """
+    return _update(uid, update_str, is_metadata, handling, bindings)
+
+
+@transaction(True)
+def update_many(updates, is_metadata=False, handling='strict'):
+    """
+    Update multiple resources with SPARQL-Update strings.
+
+    All the updates are applied in a single transaction: either all of them
+    are committed, or none is if any fails. For bulk operations this is much
+    faster than calling :py:func:`update` for each resource, which commits
+    a transaction each time.
+
+    :param updates: UIDs of the resources to update and the SPARQL-Update
+        strings to apply to each.
+    :type updates: iterable(tuple(str, str))
+    :param bool is_metadata: See :py:func:`update`.
+    :param str handling: See :py:func:`update`.
+
+    :rtype: list(lakesuperior.model.ldp.ldpr.Ldpr)
+    :return: The updated resources, in the order of ``updates``.
+    """
+    return [
+        _update(uid, update_str, is_metadata, handling)
+        for uid, update_str in updates
+    ]
+
+
+def _update(uid, update_str, is_metadata, handling, bindings=None):
+    """
+    Update a resource within an open write transaction.
+
+    See :py:func:`update` for the parameters.
+    """
     rsrc = LdpFactory.from_stored(uid, handling=handling)
     if LDP_NR_TYPE in rsrc.ldp_types and not is_metadata:
         raise InvalidResourceError(
                 'Cannot use this method to update an LDP-NR content.')
 
-    delta = rsrc.sparql_delta(update_str)
+    delta = rsrc.sparql_delta(update_str, bindings)
     rsrc.modify(RES_UPDATED, *delta)
 
     return rsrc
@@ -291,8 +352,14 @@ def update_delta(uid, remove_trp, add_trp):
         (rel_uri_to_urn(s, uid), p, rel_uri_to_urn(o, uid))
         for s, p, o in add_trp
     }
-    remove_trp = rsrc.check_mgd_terms(remove_trp)
-    add_trp = rsrc.check_mgd_terms(add_trp)
+    # Removing a triple that is added back is a no-op, so it is dropped from
+    # the removals rather than round-tripped to the store.
+    if remove_trp and add_trp:
+        remove_trp -= add_trp
+    if remove_trp:
+        remove_trp = rsrc.check_mgd_terms(remove_trp)
+    if add_trp:
+        add_trp = rsrc.check_mgd_terms(add_trp)
 
     return rsrc.modify(RES_UPDATED, remove_trp, add_trp)
 
@@ -324,8 +391,7 @@ def delete(uid, soft=True, inbound=True):
     """
     # If referential integrity is enforced, grab all inbound relationships
     # to break them.
-    refint = env.app_globals.rdfly.config['referential_integrity']
-    inbound = True if refint else inbound
+    inbound = True if _ref_int else inbound
 
     if soft:
         repr_opts = {'incl_inbound' : True} if inbound else {}
@@ -1,10 +1,10 @@
 from lakesuperior.dictionaries.namespaces import ns_collection as nsc
 
-srv_mgd_subjects = {
+srv_mgd_subjects = frozenset({
     nsc['fcsystem'].root,
-}
+})
 
-srv_mgd_predicates = {
+srv_mgd_predicates = frozenset({
     nsc['fcrepo'].created,
     nsc['fcrepo'].createdBy,
     nsc['fcrepo'].hasFixityService,
@@ -16,9 +16,9 @@ srv_mgd_predicates = {
     nsc['ldp'].contains,
     nsc['premis'].hasMessageDigest,
     nsc['premis'].hasSize,
-}
+})
 
-srv_mgd_types = {
+srv_mgd_types = frozenset({
     nsc['fcrepo'].Binary,
     nsc['fcrepo'].Container,
     nsc['fcrepo'].Pairtree,
@@ -31,6 +31,6 @@ srv_mgd_types = {
     nsc['ldp'].NonRDFSource,
     nsc['ldp'].RDFSource,
     nsc['ldp'].Resource,
-}
+})
 
 
@@ -1,11 +1,10 @@
-import hashlib
 import logging
 import pdb
 
 from base64 import b64encode
 from collections import defaultdict
+from functools import lru_cache
 from io import BytesIO
-from pprint import pformat
 from uuid import uuid4
 
 import arrow
@@ -105,7 +104,7 @@ def bp_url_value_preprocessor(endpoint, values):
 
 @ldp.before_request
 def log_request_start():
-    logger.info('** Start {} {} **'.format(request.method, request.url))
+    logger.info('** Start %s %s **', request.method, request.url)
 
 
 @ldp.before_request
@@ -115,7 +114,7 @@ def instantiate_req_vars():
 
 @ldp.after_request
 def log_request_end(rsp):
-    logger.info('** End {} {} **'.format(request.method, request.url))
+    logger.info('** End %s %s **', request.method, request.url)
 
     return rsp
 
@@ -160,7 +159,7 @@ def get_resource(uid, out_fmt=None):
     # Evaluate which representation is requested.
     if 'prefer' in request.headers:
         prefer = toolbox.parse_rfc7240(request.headers['prefer'])
-        logger.debug('Parsed Prefer header: {}'.format(pformat(prefer)))
+        logger.debug('Parsed Prefer header: %s', prefer)
         if 'return' in prefer:
             repr_options = parse_repr_options(prefer['return'])
 
@@ -315,7 +314,7 @@ def put_resource(uid):
     Add or replace a new resource at a specified URI.
     """
     # Parse headers.
-    logger.debug('Request headers: {}'.format(request.headers))
+    logger.debug('Request headers: %s', request.headers)
 
     cond_ret = _process_cond_headers(uid, request.headers, False)
     if cond_ret:
@@ -387,7 +386,8 @@ def patch_resource(uid, is_metadata=False):
                 .format(request.mimetype), 415
 
     update_str = request.get_data().decode('utf-8')
-    local_update_str = g.tbox.localize_ext_str(update_str, nsc['fcres'][uid])
+    local_update_str = g.tbox.localize_ext_str(
+            update_str, toolbox.uid_to_urn(uid))
     try:
         rsrc = rsrc_api.update(uid, local_update_str, is_metadata, handling)
     except (exc.ServerManagedTermError, exc.SingleSubjectError) as e:
@@ -630,7 +630,7 @@ def _set_post_put_params():
     handling = 'strict'
     if 'prefer' in request.headers:
         prefer = toolbox.parse_rfc7240(request.headers['prefer'])
-        logger.debug('Parsed Prefer header: {}'.format(prefer))
+        logger.debug('Parsed Prefer header: %s', prefer)
         if 'handling' in prefer:
             handling = prefer['handling']['value']
 
@@ -652,7 +652,7 @@ def parse_repr_options(retr_opts):
 
     :param dict retr_opts:: Options parsed from `Prefer` header.
     """
-    logger.debug('Parsing retrieval options: {}'.format(retr_opts))
+    logger.debug('Parsing retrieval options: %s', retr_opts)
     imr_options = {}
 
     if retr_opts.get('value') == 'minimal':
@@ -678,8 +678,8 @@ def parse_repr_options(retr_opts):
             omit = retr_opts['parameters']['omit'].split(' ') \
                     if 'omit' in retr_opts['parameters'] else []
 
-            logger.debug('Include: {}'.format(include))
-            logger.debug('Omit: {}'.format(omit))
+            logger.debug('Include: %s', include)
+            logger.debug('Omit: %s', omit)
 
             if str(Ldpr.EMBED_CHILD_RES_URI) in include:
                     imr_options['embed_children'] = True
@@ -690,7 +690,7 @@ def parse_repr_options(retr_opts):
             if str(Ldpr.RETURN_SRV_MGD_RES_URI) in omit:
                     imr_options['incl_srv_mgd'] = False
 
-    logger.debug('Retrieval options: {}'.format(pformat(imr_options)))
+    logger.debug('Retrieval options: %s', imr_options)
 
     return imr_options
 
@@ -702,7 +702,7 @@ def _headers_from_metadata(rsrc, out_fmt='text/turtle'):
     :param lakesuperior.model.ldp.ldpr.Ldpr rsrc: Resource to extract metadata
         from.
     """
-    rsp_headers = defaultdict(list)
+    rsp_headers = {}
 
     digest_p = rsrc.metadata.value(nsc['premis'].hasMessageDigest)
     # Only add ETag and digest if output is not RDF.
@@ -713,11 +713,9 @@ def _headers_from_metadata(rsrc, out_fmt='text/turtle'):
 
     last_updated_term = rsrc.metadata.value(nsc['fcrepo'].lastModified)
     if last_updated_term:
-        rsp_headers['Last-Modified'] = arrow.get(last_updated_term)\
-            .format('ddd, D MMM YYYY HH:mm:ss Z')
+        rsp_headers['Last-Modified'] = toolbox.http_date(last_updated_term)
 
-    for t in rsrc.ldp_types:
-        rsp_headers['Link'].append('{};rel="type"'.format(t.n3()))
+    rsp_headers['Link'] = [toolbox.ldp_type_link(t) for t in rsrc.ldp_types]
 
     if rsrc.mimetype:
         rsp_headers['Content-Type'] = rsrc.mimetype
@@ -725,10 +723,13 @@ def _headers_from_metadata(rsrc, out_fmt='text/turtle'):
     return rsp_headers
 
 
+@lru_cache(maxsize=1024)
 def _digest_headers(digest):
     """
     Format ETag and Digest headers from resource checksum.
 
+    The values only change when the content does, so they are memoized.
+
     :param str digest: Resource digest. For an extracted IMR, this is the
         value of the ``premis:hasMessageDigest`` property.
     """
@@ -799,7 +800,7 @@ def _condition_hdr_match(uid, headers, safe=True):
             try:
                 rsrc_meta = rsrc_api.get_metadata(uid)
             except exc.ResourceNotExistsError:
-                rsrc_meta = Graph(uri=nsc['fcres'][uid])
+                rsrc_meta = Graph(uri=toolbox.uid_to_urn(uid))
 
             digest_prop = rsrc_meta.value(nsc['premis'].hasMessageDigest)
 
@@ -41,9 +41,9 @@ def term_search():
     if request.method == 'POST':
         terms = request.json.get('terms', {})
         or_logic = request.json.get('logic', 'and') == 'or'
-        logger.info('Form: {}'.format(request.json))
-        logger.info('Terms: {}'.format(terms))
-        logger.info('Logic: {}'.format(or_logic))
+        logger.info('Form: %s', request.json)
+        logger.info('Terms: %s', terms)
+        logger.info('Logic: %s', or_logic)
         qres = query_api.term_query(terms, or_logic)
 
         rsp = [
@@ -74,7 +74,7 @@ def sparql():
             qstr = request.stream.read()
         else:
             qstr = request.form['query']
-        logger.debug('Query: {}'.format(qstr))
+        logger.debug('Query: %s', qstr)
 
         match = request.accept_mimetypes.best_match(accept_mimetypes.keys())
         fmt = (
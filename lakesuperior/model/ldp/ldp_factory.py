@@ -1,41 +1,85 @@
 import logging
 
-from pprint import pformat
-from uuid import uuid4
+from functools import lru_cache
 
-from rdflib.resource import Resource
-from rdflib.namespace import RDF
-
-from lakesuperior import env
+from lakesuperior import env, thread_env
 from lakesuperior import exceptions as exc
-from lakesuperior.model.ldp.ldpr import Ldpr
 from lakesuperior.model.ldp.ldp_nr import LdpNr
 from lakesuperior.model.ldp.ldp_rs import LdpRs, Ldpc, LdpDc, LdpIc
-from lakesuperior.config_parser import config
 from lakesuperior.dictionaries.namespaces import ns_collection as nsc
 from lakesuperior.model.rdf.graph import Graph, from_rdf
-from lakesuperior.util.toolbox import rel_uri_to_urn
+from lakesuperior.util.toolbox import random_uuid, uid_to_urn
 
 
 LDP_NR_TYPE = nsc['ldp'].NonRDFSource
 LDP_RS_TYPE = nsc['ldp'].RDFSource
 
-rdfly = env.app_globals.rdfly
+_RDF_TYPE = nsc['rdf'].type
+_FCREPO_RESOURCE = nsc['fcrepo'].Resource
+_LDP_CONTAINER = nsc['ldp'].Container
+_LDP_DC = nsc['ldp'].DirectContainer
+_LDP_IC = nsc['ldp'].IndirectContainer
+
+# LDP classes keyed by the subset of the relevant RDF types found in a
+# resource. If both types of a pair are found, the more specific class wins.
+_LDPR_TYPES = frozenset({LDP_NR_TYPE, LDP_RS_TYPE})
+_LDPR_TYPE_MAP = {
+    frozenset({LDP_NR_TYPE}): LdpNr,
+    frozenset({LDP_RS_TYPE}): LdpRs,
+    _LDPR_TYPES: LdpNr,
+}
+_CONTAINER_TYPES = frozenset({_LDP_DC, _LDP_IC})
+_CONTAINER_TYPE_MAP = {
+    frozenset({_LDP_DC}): LdpDc,
+    frozenset({_LDP_IC}): LdpIc,
+    _CONTAINER_TYPES: LdpIc,
+}
+
+DEF_METADATA_CACHE_SIZE = 1024
+"""Default maximum number of entries in the request-scoped metadata cache."""
+
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _rdfly_for(app_globals):
+    return app_globals.rdfly
+
+
+def _rdfly():
+    """
+    RDF layout of the current application globals.
+
+    The layout is resolved on first use rather than at import time, and the
+    lookup is cached per ``AppGlobals`` instance, so that swapping
+    ``env.app_globals`` (e.g. in tests) is picked up.
+    """
+    return _rdfly_for(env.app_globals)
+
+
 class LdpFactory:
     """
     Generate LDP instances.
     The instance classes are based on provided client data or on stored data.
     """
     @staticmethod
-    def new_container(uid):
+    def new_container(uid, skip_exists_check=False):
+        """
+        Create a new, empty container instance.
+
+        :param str uid: UID of the container.
+        :param bool skip_exists_check: If ``True``, the store is not queried
+            to verify that no resource with the same UID exists. The caller
+            is responsible for guaranteeing that.
+
+        :raise lakesuperior.exceptions.ResourceExistsError: if the resource
+            exists and the existence check is not skipped.
+        """
         if not uid.startswith('/') or uid == '/':
             raise exc.InvalidResourceError(uid)
-        if rdfly.ask_rsrc_exists(uid):
+        if not skip_exists_check and _rdfly().ask_rsrc_exists(uid):
             raise exc.ResourceExistsError(uid)
-        rsrc = Ldpc(uid, provided_imr=Graph(uri=nsc['fcres'][uid]))
+        rsrc = Ldpc(uid, provided_imr=Graph(uri=uid_to_urn(uid)))
 
         return rsrc
 
@@ -51,28 +95,82 @@ class LdpFactory:
 
         N.B. The resource must exist.
 
+        Within a transaction, metadata are looked up in a request-scoped LRU
+        cache before querying the store. See :py:meth:`invalidate`.
+
         :param str uid: UID of the instance.
         """
-        # This will blow up if strict is True and the resource is a tombstone.
-        rsrc_meta = rdfly.get_metadata(uid, strict=strict)
-        rdf_types = rsrc_meta[nsc['fcres'][uid] : RDF.type]
-
-        if LDP_NR_TYPE in rdf_types:
-            logger.info('Resource is a LDP-NR.')
-            cls = LdpNr
-        elif LDP_RS_TYPE in rdf_types:
-            logger.info('Resource is a LDP-RS.')
-            cls = LdpRs
+        cache = getattr(thread_env, 'metadata_cache', None)
+        cache_key = (uid, strict)
+        if cache is not None and cache_key in cache:
+            cache.move_to_end(cache_key)
+            rsrc_meta = cache[cache_key]
         else:
+            # This will blow up if strict is True and the resource is a
+            # tombstone.
+            rsrc_meta = _rdfly().get_metadata(uid, strict=strict)
+            if cache is not None:
+                cache[cache_key] = rsrc_meta
+                if len(cache) > thread_env.metadata_cache_size:
+                    cache.popitem(last=False)
+        rdf_types = rsrc_meta[uid_to_urn(uid) : _RDF_TYPE]
+
+        cls = _LDPR_TYPE_MAP.get(_LDPR_TYPES.intersection(rdf_types))
+        if cls is None:
             raise exc.ResourceNotExistsError(uid)
+        logger.debug('Resource is a %s.', cls.__name__)
 
         rsrc = cls(uid, repr_opts, **kwargs)
-        # Sneak in the already extracted metadata to save a query.
+        # Sneak in the already extracted metadata to save a query. This is
+        # the same lookup as ``ask_rsrc_exists``, so it also tells whether
+        # the resource is stored.
         rsrc._metadata = rsrc_meta
+        rsrc._is_stored = _FCREPO_RESOURCE in rdf_types
 
         return rsrc
 
 
+    @staticmethod
+    def from_stored_many(uids, repr_opts={}, strict=True, **kwargs):
+        """
+        Generate instances for retrieval purposes from a sequence of UIDs.
+
+        This is meant for bulk operations: each instance is created with
+        :py:meth:`from_stored` only when the generator is advanced. Resources
+        that do not exist, or, if ``strict`` is ``True``, are tombstones, are
+        skipped rather than aborting the whole operation.
+
+        :param iterable uids: UIDs of the instances.
+        :param dict repr_opts: See :py:meth:`from_stored`.
+        :param bool strict: See :py:meth:`from_stored`.
+
+        :rtype: iterator(lakesuperior.model.ldp.ldpr.Ldpr)
+        """
+        for uid in uids:
+            try:
+                yield _from_stored(
+                        uid, repr_opts=repr_opts, strict=strict, **kwargs)
+            except (exc.ResourceNotExistsError, exc.TombstoneError):
+                continue
+
+
+    @staticmethod
+    def invalidate(uid):
+        """
+        Drop a resource from the request-scoped metadata cache.
+
+        This must be called after any write to the resource, so that a
+        subsequent :py:meth:`from_stored` call in the same transaction does
+        not return stale metadata.
+
+        :param str uid: UID of the changed resource.
+        """
+        cache = getattr(thread_env, 'metadata_cache', None)
+        if cache is not None:
+            cache.pop((uid, True), None)
+            cache.pop((uid, False), None)
+
+
     @staticmethod
     def from_provided(
             uid, mimetype=None, stream=None, graph=None, rdf_data=None,
@@ -97,28 +195,23 @@ class LdpFactory:
         :raise ValueError: if ``mimetype`` is specified but no data stream is
             provided.
         """
-        uri = nsc['fcres'][uid]
+        uri = uid_to_urn(uid)
+        handling = kwargs.get('handling', 'strict')
         if rdf_data:
             try:
                 provided_imr = from_rdf(
                         uri=uri, data=rdf_data,
-                        format=rdf_fmt, publicID=nsc['fcres'][uid])
+                        format=rdf_fmt, publicID=uri)
             except Exception as e:
                 raise exc.RdfParsingError(rdf_fmt, str(e))
 
         elif graph:
-            provided_imr = Graph(
-                uri=uri, data={
-                    (rel_uri_to_urn(s, uid), p, rel_uri_to_urn(o, uid))
-                    for s, p, o in graph
-                }
-            )
+            # Relative URIs are resolved within the graph's C loop.
+            provided_imr = Graph(uri=uri, capacity=len(graph))
+            provided_imr.add_relative(graph, uri)
         else:
             provided_imr = Graph(uri=uri)
 
-        #logger.debug('Provided graph: {}'.format(
-        #        pformat(set(provided_imr))))
-
         if stream is None:
             # Resource is a LDP-RS.
             if mimetype:
@@ -126,12 +219,9 @@ class LdpFactory:
                     'Binary stream must be provided if mimetype is specified.')
 
             # Determine whether it is a basic, direct or indirect container.
-            if provided_imr[nsc['rdf'].type] == nsc['ldp'].IndirectContainer:
-                cls = LdpIc
-            elif provided_imr[nsc['rdf'].type] == nsc['ldp'].DirectContainer:
-                cls = LdpDc
-            else:
-                cls = Ldpc
+            cls = _CONTAINER_TYPE_MAP.get(
+                    _CONTAINER_TYPES.intersection(provided_imr[_RDF_TYPE]),
+                    Ldpc)
 
             inst = cls(uid, provided_imr=provided_imr, **kwargs)
 
@@ -139,7 +229,7 @@ class LdpFactory:
             if inst.is_stored and LDP_NR_TYPE in inst.ldp_types:
                 raise exc.IncompatibleLdpTypeError(uid, mimetype)
 
-            if kwargs.get('handling', 'strict') != 'none':
+            if handling != 'none':
                 inst.check_mgd_terms(inst.provided_imr)
 
         else:
@@ -154,14 +244,13 @@ class LdpFactory:
             if inst.is_stored and LDP_RS_TYPE in inst.ldp_types:
                 raise exc.IncompatibleLdpTypeError(uid, mimetype)
 
-        logger.debug('Creating resource of type: {}'.format(
-                inst.__class__.__name__))
+        logger.debug('Creating resource of type: %s', inst.__class__.__name__)
 
         return inst
 
 
     @staticmethod
-    def mint_uid(parent_uid, path=None):
+    def mint_uid(parent_uid, path=None, skip_parent_check=False):
         """
         Mint a new resource UID based on client directives.
 
@@ -174,6 +263,9 @@ class LdpFactory:
         :param str parent_uid: UID of the parent resource. It must be an
             existing LDPC.
         :param str path: path to the resource, relative to the parent.
+        :param bool skip_parent_check: If ``True``, the parent is not
+            retrieved to verify that it exists and is a container. The caller
+            is responsible for guaranteeing that.
 
         :rtype: str
         :return: The confirmed resource UID. This may be different from
@@ -183,22 +275,42 @@ class LdpFactory:
             raise ValueError('Slug cannot start with a slash.')
         # Shortcut!
         if not path and parent_uid == '/':
-            return f'/{uuid4()}'
+            return f'/{random_uuid()}'
 
         if not parent_uid.startswith('/'):
             raise ValueError('Invalid parent UID: {}'.format(parent_uid))
 
-        parent = LdpFactory.from_stored(parent_uid)
-        if nsc['ldp'].Container not in parent.types:
-            raise exc.InvalidResourceError(parent_uid,
-                    'Parent {} is not a container.')
+        if not skip_parent_check:
+            parent = _from_stored(parent_uid)
+            if _LDP_CONTAINER not in parent.types:
+                raise exc.InvalidResourceError(parent_uid,
+                        'Parent {} is not a container.')
 
         pfx = parent_uid.rstrip('/') + '/'
         if path:
             cnd_uid = pfx + path
-            if not rdfly.ask_rsrc_exists(cnd_uid):
+            if not _rdfly().ask_rsrc_exists(cnd_uid):
                 return cnd_uid
 
-        return f'{pfx}{uuid4()}'
+        # Random UUIDs are not checked for collisions.
+        return f'{pfx}{random_uuid()}'
+
+
+    @staticmethod
+    def mint_uid_unchecked(parent_uid):
+        """
+        Mint a random UID under a parent known to be an existing container.
+
+        This is a shortcut for bulk operations that have already validated
+        the parent. No store lookup is performed.
+
+        :param str parent_uid: UID of the parent container.
+
+        :rtype: str
+        """
+        return LdpFactory.mint_uid(parent_uid, skip_parent_check=True)
 
 
+# Plain function aliases of the factory methods, used internally to skip the
+# class attribute lookup on hot paths.
+_from_stored = LdpFactory.from_stored
@@ -21,13 +21,17 @@ class LdpNr(Ldpr):
 
     Definition: https://www.w3.org/TR/ldp/#ldpnr
     """
+    __slots__ = (
+        'stream', 'disposition', 'prov_cksum_algo', 'prov_cksum', 'digest',
+        'size',
+    )
 
-    base_types = {
+    base_types = frozenset({
         nsc['fcrepo'].Binary,
         nsc['fcrepo'].Resource,
         nsc['ldp'].Resource,
         nsc['ldp'].NonRDFSource,
-    }
+    })
 
     def __init__(self, uuid, stream=None, mimetype=None,
             disposition=None, prov_cksum_algo=None, prov_cksum=None,
@@ -114,7 +118,7 @@ class LdpNr(Ldpr):
                 prov_cksum=self.prov_cksum)
 
         # Try to persist metadata. If it fails, delete the file.
-        logger.debug('Persisting LDP-NR triples in {}'.format(self.uri))
+        logger.debug('Persisting LDP-NR triples in %s', self.uri)
         try:
             ev_type = super().create_or_replace(create_only)
         except:
@@ -139,24 +143,26 @@ class LdpNr(Ldpr):
         super()._add_srv_mgd_triples(*args, **kwargs)
 
         # File size.
-        logger.debug('Data stream size: {}'.format(self.size))
-        self.provided_imr.set((
-            self.uri, nsc['premis'].hasSize, Literal(self.size)))
+        logger.debug('Data stream size: %s', self.size)
+        srv_mgd_trp = [(self.uri, nsc['premis'].hasSize, Literal(self.size))]
 
         # Checksum.
         cksum_term = URIRef(f'urn:{default_hash_algo}:{self.digest}')
-        self.provided_imr.set((
-            self.uri, nsc['premis'].hasMessageDigest, cksum_term))
+        srv_mgd_trp.append(
+                (self.uri, nsc['premis'].hasMessageDigest, cksum_term))
 
         # MIME type.
-        self.provided_imr.set((
+        srv_mgd_trp.append((
             self.uri, nsc['ebucore']['hasMimeType'], Literal(self.mimetype)))
 
         # File name.
-        logger.debug('Disposition: {}'.format(self.disposition))
+        logger.debug('Disposition: %s', self.disposition)
         try:
-            self.provided_imr.set((
+            srv_mgd_trp.append((
                 self.uri, nsc['ebucore']['filename'], Literal(
                 self.disposition['attachment']['parameters']['filename'])))
         except (KeyError, TypeError) as e:
             pass
+
+        # All values are set in one pass.
+        self.provided_imr.set_many(srv_mgd_trp)
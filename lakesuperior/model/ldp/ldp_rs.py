@@ -17,6 +17,13 @@ class LdpRs(Ldpr):
 
     https://www.w3.org/TR/ldp/#ldprs
     """
+    __slots__ = ()
+
+    base_types = Ldpr.base_types | {
+        nsc['fcrepo'].Container,
+        nsc['ldp'].Container,
+    }
+
     def __init__(self, uuid, repr_opts={}, handling='lenient', **kwargs):
         """
         Extends :meth:`Ldpr.__init__`by adding LDP-RS specific parameters.
@@ -28,10 +35,6 @@ class LdpRs(Ldpr):
         modifications.
         """
         super().__init__(uuid, **kwargs)
-        self.base_types = super().base_types | {
-            nsc['fcrepo'].Container,
-            nsc['ldp'].Container,
-        }
 
         # provided_imr can be empty. If None, it is an outbound resource.
         if self.provided_imr is not None:
@@ -46,40 +49,35 @@ class LdpRs(Ldpr):
 
 class Ldpc(LdpRs):
     """LDPC (LDP Container)."""
-    def __init__(self, uuid, *args, **kwargs):
-        super().__init__(uuid, *args, **kwargs)
-        self.base_types |= {
-            nsc['fcrepo'].Container,
-            nsc['ldp'].Container,
-        }
+    __slots__ = ()
 
 
 
 class LdpBc(Ldpc):
     """LDP-BC (LDP Basic Container)."""
-    def __init__(self, uuid, *args, **kwargs):
-        super().__init__(uuid, *args, **kwargs)
-        self.base_types |= {
-            nsc['ldp'].BasicContainer,
-        }
+    __slots__ = ()
+
+    base_types = Ldpc.base_types | {
+        nsc['ldp'].BasicContainer,
+    }
 
 
 
 class LdpDc(Ldpc):
     """LDP-DC (LDP Direct Container)."""
-    def __init__(self, uuid, *args, **kwargs):
-        super().__init__(uuid, *args, **kwargs)
-        self.base_types |= {
-            nsc['ldp'].DirectContainer,
-        }
+    __slots__ = ()
+
+    base_types = Ldpc.base_types | {
+        nsc['ldp'].DirectContainer,
+    }
 
 
 
 class LdpIc(Ldpc):
     """LDP-IC (LDP Indirect Container)."""
-    def __init__(self, uuid, *args, **kwargs):
-        super().__init__(uuid, *args, **kwargs)
-        self.base_types |= {
-            nsc['ldp'].IndirectContainer,
-        }
+    __slots__ = ()
+
+    base_types = Ldpc.base_types | {
+        nsc['ldp'].IndirectContainer,
+    }
 
@@ -3,20 +3,16 @@ import re
 
 from abc import ABCMeta
 from collections import defaultdict
-from hashlib import sha256
-# The threading and multiprocessing options below can be toggled by commenting
-# either one.
-#from threading import Thread as _Defer
-from multiprocessing import Process as _Defer
+from functools import lru_cache
 from urllib.parse import urldefrag
-from uuid import uuid4
 
-import arrow
 import rdflib
 
-from rdflib import URIRef, Literal
+from rdflib import BNode, URIRef, Literal
 from rdflib.compare import to_isomorphic
 from rdflib.namespace import RDF
+from rdflib.plugins.memory import IOMemory
+from rdflib.plugins.parsers.ntriples import NTriplesParser, ParseError
 
 from lakesuperior import env, thread_env
 from lakesuperior.globals import (
@@ -27,17 +23,71 @@ from lakesuperior.dictionaries.srv_mgd_terms import (
 from lakesuperior.exceptions import (
     InvalidResourceError, RefIntViolationError, ResourceNotExistsError,
     ServerManagedTermError, TombstoneError)
-from lakesuperior.model.rdf.graph import Graph
+from lakesuperior.model.rdf.graph import Graph, TripleSetSink
 from lakesuperior.store.ldp_rs.rsrc_centric_layout import VERS_CONT_LABEL
 from lakesuperior.util.toolbox import (
-        rel_uri_to_urn_string, replace_term_domain)
+        http_date, ldp_type_link, random_uuid, rel_uri_to_urn_string,
+        replace_term_domain, uid_to_urn)
 
 DEF_MBR_REL_URI = nsc['ldp'].member
 DEF_INS_CNT_REL_URI = nsc['ldp'].memberSubject
 
+# Terms used on every create, built once.
+_LDP_NS = str(nsc['ldp'])
+_LDP_CONTAINER = nsc['ldp'].Container
+_LDP_CONTAINS = nsc['ldp'].contains
+_LDP_IC = nsc['ldp'].IndirectContainer
+_FCREPO_HAS_PARENT = nsc['fcrepo'].hasParent
+_FCREPO_RESOURCE = nsc['fcrepo'].Resource
+_FCREPO_CREATED = nsc['fcrepo'].created
+_FCREPO_CREATED_BY = nsc['fcrepo'].createdBy
+_FCREPO_LAST_MODIFIED = nsc['fcrepo'].lastModified
+_FCREPO_LAST_MODIFIED_BY = nsc['fcrepo'].lastModifiedBy
+_FCREPO_HAS_VERSION = nsc['fcrepo'].hasVersion
+_FCREPO_HAS_VERSIONS = nsc['fcrepo'].hasVersions
+_FCREPO_HAS_VERSION_LABEL = nsc['fcrepo'].hasVersionLabel
+_FCREPO_VERSION = nsc['fcrepo'].Version
+_FCSYSTEM_BURIED = nsc['fcsystem'].buried
+_FCSYSTEM_TOMBSTONE = nsc['fcsystem'].tombstone
+_FCSYSTEM_TOMBSTONE_TYPE = nsc['fcsystem'].Tombstone
+_LDP_RESOURCE = nsc['ldp'].Resource
+_PREMIS_HAS_DIGEST = nsc['premis'].hasMessageDigest
+_FCRES_PFX = str(nsc['fcres'])
+_DC_IC_TYPES = frozenset({nsc['ldp'].DirectContainer, _LDP_IC})
+
 rdfly = env.app_globals.rdfly
 logger = logging.getLogger(__name__)
 
+# Configuration read on every write, resolved once like ``rdfly``.
+_ref_int = rdfly.config['referential_integrity']
+_messaging = env.app_globals.config['application'].get('messaging')
+
+_update_init_ns = dict(rdflib.Graph().namespaces())
+"""
+Namespaces that RDFLib makes available to a SPARQL update on a new graph.
+"""
+
+_data_update_ptn = re.compile(
+        r'^\s*(INSERT|DELETE)\s+DATA\s*\{(.*)\}\s*;?\s*$',
+        re.DOTALL | re.IGNORECASE)
+"""
+Single ``INSERT DATA`` or ``DELETE DATA`` operation. The data block may be
+parsed as N-Triples.
+"""
+
+
+@lru_cache(maxsize=1)
+def _ldp_factory():
+    """
+    LDP factory class.
+
+    The factory module imports this one, so it cannot be imported at module
+    level. It is resolved on first use instead of running an import statement
+    on every call.
+    """
+    from lakesuperior.model.ldp.ldp_factory import LdpFactory
+    return LdpFactory
+
 
 class Ldpr(metaclass=ABCMeta):
     """
@@ -78,11 +128,11 @@ class Ldpr(metaclass=ABCMeta):
     is not provided.
     """
 
-    base_types = {
+    base_types = frozenset({
         nsc['fcrepo'].Resource,
         nsc['ldp'].Resource,
         nsc['ldp'].RDFSource,
-    }
+    })
     """RDF Types that populate a new resource."""
 
     protected_pred = (
@@ -92,34 +142,34 @@ class Ldpr(metaclass=ABCMeta):
     )
     """Predicates that do not get removed when a resource is replaced."""
 
-    smt_allow_on_create = {
+    smt_allow_on_create = frozenset({
         nsc['ldp'].DirectContainer,
         nsc['ldp'].IndirectContainer,
-    }
+    })
     """
     Server-managed RDF types ignored in the RDF payload if the resource is
     being created. N.B. These still raise an error if the resource exists.
     """
 
-    delete_preds_on_replace = {
+    delete_preds_on_replace = frozenset({
         nsc['ebucore'].hasMimeType,
         nsc['fcrepo'].lastModified,
         nsc['fcrepo'].lastModifiedBy,
         nsc['premis'].hasSize,
         nsc['premis'].hasMessageDigest,
-    }
+    })
     """Predicates to remove when a resource is replaced."""
 
-    _ignore_version_preds = {
+    _ignore_version_preds = frozenset({
         nsc['fcrepo'].hasParent,
         nsc['fcrepo'].hasVersions,
         nsc['fcrepo'].hasVersion,
         nsc['premis'].hasMessageDigest,
         nsc['ldp'].contains,
-    }
+    })
     """Predicates that don't get versioned."""
 
-    _ignore_version_types = {
+    _ignore_version_types = frozenset({
         nsc['fcrepo'].Binary,
         nsc['fcrepo'].Container,
         nsc['fcrepo'].Pairtree,
@@ -131,16 +181,27 @@ class Ldpr(metaclass=ABCMeta):
         nsc['ldp'].Resource,
         nsc['ldp'].RDFSource,
         nsc['ldp'].NonRDFSource,
-    }
+    })
     """RDF types that don't get versioned."""
 
+    _out_excl_preds = frozenset({nsc['fcrepo'].hasVersion})
+    """Predicates always left out of the output graph."""
+
+    _out_excl_srv_mgd_preds = _out_excl_preds | srv_mgd_predicates
+    """
+    Predicates left out of the output graph if server-managed triples are not
+    requested.
+    """
+
     _cached_attrs = (
         '_imr',
         '_metadata',
         '_version_info',
+        '_version_uids',
         '_is_stored',
         '_types',
         '_ldp_types',
+        '_is_dc_or_ic',
     )
     """
     Attributes cached from the store.
@@ -148,6 +209,11 @@ class Ldpr(metaclass=ABCMeta):
     These are used by setters and can be cleared with :py:meth:`_clear_cache`.
     """
 
+    __slots__ = (
+        'uid', 'uri', 'provided_imr', 'mimetype', 'workflow', 'handling',
+        '_imr_options', *_cached_attrs,
+    )
+
     ## MAGIC METHODS ##
 
     def __init__(self, uid, repr_opts={}, provided_imr=None, **kwargs):
@@ -165,7 +231,7 @@ class Ldpr(metaclass=ABCMeta):
         """
         self.uid = (
             rdfly.uri_to_uid(uid) if isinstance(uid, URIRef) else uid)
-        self.uri = nsc['fcres'][uid]
+        self.uri = uid_to_urn(self.uid)
         # @FIXME Not ideal, should separate app-context dependent functions in
         # a different toolbox.
 
@@ -217,8 +283,7 @@ class Ldpr(metaclass=ABCMeta):
         """
         if not hasattr(self, '_imr'):
             if hasattr(self, '_imr_options'):
-                logger.debug(
-                    'Getting RDF triples for resource {}'.format(self.uid))
+                logger.debug('Getting RDF triples for resource %s', self.uid)
                 imr_options = self._imr_options
             else:
                 imr_options = {}
@@ -236,7 +301,14 @@ class Ldpr(metaclass=ABCMeta):
         :param v: New set of triples to populate the IMR with.
         :type v: set or rdflib.Graph
         """
-        self._imr = Graph(uri=self.uri, data=set(data))
+        if hasattr(self, '_imr'):
+            self._forget_imr_derived()
+        if isinstance(data, Graph):
+            # Copy the keys rather than converting to terms and back.
+            self._imr = data.copy()
+            self._imr.uri = self.uri
+        else:
+            self._imr = Graph(uri=self.uri, data=set(data))
 
 
     @imr.deleter
@@ -244,6 +316,7 @@ class Ldpr(metaclass=ABCMeta):
         """
         Delete in-memory buffered resource.
         """
+        self._forget_imr_derived()
         delattr(self, '_imr')
 
 
@@ -257,8 +330,7 @@ class Ldpr(metaclass=ABCMeta):
                 logger.info('Metadata is IMR.')
                 self._metadata = self._imr
             else:
-                logger.info(
-                    'Getting metadata for resource {}'.format(self.uid))
+                logger.info('Getting metadata for resource %s', self.uid)
                 self._metadata = rdfly.get_metadata(self.uid)
 
         return self._metadata
@@ -279,23 +351,16 @@ class Ldpr(metaclass=ABCMeta):
         """
         Retun a graph of the resource's IMR formatted for output.
         """
-        out_trp = set()
-
-        for t in self.imr:
-            if (
-                # Exclude digest hash and version information.
-                t[1] not in {
-                    #nsc['premis'].hasMessageDigest,
-                    nsc['fcrepo'].hasVersion,
-                }
-            ) and (
-                # Only include server managed triples if requested.
-                self._imr_options.get('incl_srv_mgd', True) or
-                not self._is_trp_managed(t)
-            ):
-                out_trp.add(t)
+        # Exclude version information, and only include server managed
+        # triples if requested. The IMR is filtered while being copied.
+        if self._imr_options.get('incl_srv_mgd', True):
+            out_gr = self.imr.without_terms(self._out_excl_preds)
+        else:
+            out_gr = self.imr.without_terms(
+                    self._out_excl_srv_mgd_preds, srv_mgd_types)
+        out_gr.uri = self.uri
 
-        return Graph(uri=self.uri, data=out_trp)
+        return out_gr
 
 
     @property
@@ -317,13 +382,16 @@ class Ldpr(metaclass=ABCMeta):
         """
         Return a set of version UIDs relative to their parent resource.
         """
-        uids = set()
-        for vuri in self.version_info[nsc['fcrepo'].hasVersion]:
-            for vlabel in self.version_info[
-                    vuri : nsc['fcrepo'].hasVersionLabel]:
-                uids.add(str(vlabel))
+        if not hasattr(self, '_version_uids'):
+            version_info = self.version_info
+            ver_label_p = _FCREPO_HAS_VERSION_LABEL
+            self._version_uids = {
+                str(vlabel)
+                for vuri in version_info[_FCREPO_HAS_VERSION]
+                for vlabel in version_info[vuri : ver_label_p]
+            }
 
-        return uids
+        return self._version_uids
 
 
     @property
@@ -331,6 +399,10 @@ class Ldpr(metaclass=ABCMeta):
         if not hasattr(self, '_is_stored'):
             if hasattr(self, '_imr'):
                 self._is_stored = len(self.imr) > 0
+            elif hasattr(self, '_metadata'):
+                # Same test as ``ask_rsrc_exists``, on the loaded metadata.
+                self._is_stored = _FCREPO_RESOURCE in (
+                        self._metadata[self.uri : RDF.type])
             else:
                 self._is_stored = rdfly.ask_rsrc_exists(self.uid)
 
@@ -344,13 +416,12 @@ class Ldpr(metaclass=ABCMeta):
         :rtype: set(rdflib.term.URIRef)
         """
         if not hasattr(self, '_types'):
-            if len(self.metadata):
-                metadata = self.metadata
-            elif getattr(self, 'provided_imr', None) and \
-                    len(self.provided_imr):
+            metadata = self.metadata
+            if not len(metadata):
+                # Only new resources have no stored metadata.
                 metadata = self.provided_imr
-            else:
-                return set()
+                if metadata is None or not len(metadata):
+                    return set()
 
             self._types = set(metadata[self.uri: RDF.type])
 
@@ -364,32 +435,41 @@ class Ldpr(metaclass=ABCMeta):
         :rtype: set(rdflib.term.URIRef)
         """
         if not hasattr(self, '_ldp_types'):
-            self._ldp_types = {t for t in self.types if nsc['ldp'] in t}
+            self._ldp_types = {t for t in self.types if t.startswith(_LDP_NS)}
 
         return self._ldp_types
 
 
+    @property
+    def is_dc_or_ic(self):
+        """Whether the resource is a direct or indirect container.
+
+        :rtype: bool
+        """
+        if not hasattr(self, '_is_dc_or_ic'):
+            self._is_dc_or_ic = not _DC_IC_TYPES.isdisjoint(self.ldp_types)
+
+        return self._is_dc_or_ic
+
+
     ## LDP METHODS ##
 
     def head(self):
         """
         Return values for the headers.
         """
-        out_headers = defaultdict(list)
+        out_headers = {}
 
-        digest = self.metadata.value(nsc['premis'].hasMessageDigest)
+        digest = self.metadata.value(_PREMIS_HAS_DIGEST)
         if digest:
-            etag = digest.identifier.split(':')[-1]
-            out_headers['ETag'] = 'W/"{}"'.format(etag),
+            etag = digest.split(':')[-1]
+            out_headers['ETag'] = f'W/"{etag}"'
 
-        last_updated_term = self.metadata.value(nsc['fcrepo'].lastModified)
+        last_updated_term = self.metadata.value(_FCREPO_LAST_MODIFIED)
         if last_updated_term:
-            out_headers['Last-Modified'] = arrow.get(last_updated_term)\
-                .format('ddd, D MMM YYYY HH:mm:ss Z')
+            out_headers['Last-Modified'] = http_date(last_updated_term)
 
-        for t in self.ldp_types:
-            out_headers['Link'].append(
-                '{};rel="type"'.format(t.n3()))
+        out_headers['Link'] = [ldp_type_link(t) for t in self.ldp_types]
 
         return out_headers
 
@@ -415,9 +495,8 @@ class Ldpr(metaclass=ABCMeta):
 
         ev_type = RES_CREATED if create else RES_UPDATED
         self._add_srv_mgd_triples(create)
-        ref_int = rdfly.config['referential_integrity']
-        if ref_int:
-            self._check_ref_int(ref_int)
+        if _ref_int:
+            self._check_ref_int(_ref_int)
 
         # Delete existing triples if replacing.
         if not create:
@@ -446,42 +525,47 @@ class Ldpr(metaclass=ABCMeta):
         :param rdflib.URIRef tstone_pointer: If set to a URI, this creates a
             pointer to the tombstone of the resource that used to contain the
             deleted resource. Otherwise the deleted resource becomes a
-            tombstone.
+            tombstone. All the descendants of a deleted resource, however
+            deep, point to the tombstone at the top of the deleted subtree.
         """
-        logger.info('Burying resource {}'.format(self.uid))
+        logger.info('Burying resource %s', self.uid)
         # ldp:Resource is also used in rdfly.ask_rsrc_exists.
         remove_trp = {
-            (nsc['fcrepo'].uid, nsc['rdf'].type, nsc['ldp'].Resource)
+            (nsc['fcrepo'].uid, RDF.type, _LDP_RESOURCE)
         }
 
         if tstone_pointer:
             add_trp = {
-                (self.uri, nsc['fcsystem'].tombstone, tstone_pointer)}
+                (self.uri, _FCSYSTEM_TOMBSTONE, tstone_pointer)}
         else:
             add_trp = {
-                (self.uri, RDF.type, nsc['fcsystem'].Tombstone),
-                (self.uri, nsc['fcsystem'].buried, thread_env.timestamp_term),
+                (self.uri, RDF.type, _FCSYSTEM_TOMBSTONE_TYPE),
+                (self.uri, _FCSYSTEM_BURIED, thread_env.timestamp_term),
             }
 
-        # Bury descendants.
-        from lakesuperior.model.ldp.ldp_factory import LdpFactory
-        for desc_uri in rdfly.get_descendants(self.uid):
-            try:
-                desc_rsrc = LdpFactory.from_stored(
-                    env.app_globals.rdfly.uri_to_uid(desc_uri),
-                    repr_opts={'incl_children' : False})
-            except (TombstoneError, ResourceNotExistsError):
-                continue
-            desc_rsrc.bury(inbound, tstone_pointer=self.uri)
-
-        # Cut inbound relationships
+        # Bury descendants. These are retrieved recursively, so only the
+        # top resource of the subtree (the one without a tombstone pointer)
+        # needs to look them up.
+        if not tstone_pointer:
+            LdpFactory = _ldp_factory()
+            for desc_rsrc in LdpFactory.from_stored_many(
+                    (rdfly.uri_to_uid(desc_uri)
+                        for desc_uri in rdfly.get_descendants(self.uid)),
+                    repr_opts={'incl_children' : False}):
+                desc_rsrc.bury(inbound, tstone_pointer=self.uri)
+
+        # Cut inbound relationships. Referring subjects (e.g. hash URIs) are
+        # grouped by resource, so each referring resource is updated once.
         if inbound:
-            for ib_rsrc_uri in self.imr[ : : self.uri]:
-                remove_trp = {(ib_rsrc_uri, None, self.uri)}
-                ib_rsrc = Ldpr(ib_rsrc_uri)
+            ib_remove_trp = defaultdict(set)
+            for ib_uri in self.imr[ : : self.uri]:
+                ib_remove_trp[urldefrag(ib_uri).url].add(
+                        (ib_uri, None, self.uri))
+            for ib_rsrc_uri, ib_trp in ib_remove_trp.items():
+                ib_rsrc = Ldpr(URIRef(ib_rsrc_uri))
                 # To preserve inbound links in history, create a snapshot
                 ib_rsrc.create_version()
-                ib_rsrc.modify(RES_UPDATED, remove_trp)
+                ib_rsrc.modify(RES_UPDATED, ib_trp)
 
         self.modify(RES_DELETED, remove_trp, add_trp)
 
@@ -493,34 +577,49 @@ class Ldpr(metaclass=ABCMeta):
         """
         Remove all traces of a resource and versions.
         """
-        logger.info('Forgetting resource {}'.format(uid))
+        logger.info('Forgetting resource %s', uid)
 
+        # Descendants are deleted along with the resource, so they must be
+        # collected beforehand to drop them from the metadata cache.
+        desc_uids = [
+                rdfly.uri_to_uid(desc_uri)
+                for desc_uri in rdfly.get_descendants(uid)]
         rdfly.forget_rsrc(uid, inbound)
 
+        LdpFactory = _ldp_factory()
+        LdpFactory.invalidate(uid)
+        for desc_uid in desc_uids:
+            LdpFactory.invalidate(desc_uid)
+
         return RES_DELETED
 
 
-    def resurrect(self):
+    def resurrect(self, recurse=True):
         """
         Resurrect a resource from a tombstone.
+
+        :param bool recurse: Whether to also resurrect all the descendants.
+            These are retrieved recursively, so this is only needed for the
+            top resource of the subtree.
         """
         remove_trp = {
-            (self.uri, nsc['rdf'].type, nsc['fcsystem'].Tombstone),
-            (self.uri, nsc['fcsystem'].tombstone, None),
-            (self.uri, nsc['fcsystem'].buried, None),
+            (self.uri, RDF.type, _FCSYSTEM_TOMBSTONE_TYPE),
+            (self.uri, _FCSYSTEM_TOMBSTONE, None),
+            (self.uri, _FCSYSTEM_BURIED, None),
         }
         add_trp = {
-            (self.uri, nsc['rdf'].type, nsc['ldp'].Resource),
+            (self.uri, RDF.type, _LDP_RESOURCE),
         }
 
         self.modify(RES_CREATED, remove_trp, add_trp)
 
         # Resurrect descendants.
-        from lakesuperior.model.ldp.ldp_factory import LdpFactory
-        descendants = env.app_globals.rdfly.get_descendants(self.uid)
-        for desc_uri in descendants:
-            LdpFactory.from_stored(
-                    rdfly.uri_to_uid(desc_uri), strict=False).resurrect()
+        if recurse:
+            LdpFactory = _ldp_factory()
+            for desc_uri in rdfly.get_descendants(self.uid):
+                LdpFactory.from_stored(
+                        rdfly.uri_to_uid(desc_uri), strict=False
+                ).resurrect(recurse=False)
 
         return self.uri
 
@@ -537,33 +636,36 @@ class Ldpr(metaclass=ABCMeta):
             is minted.
         """
         if not ver_uid or ver_uid in self.version_uids:
-            ver_uid = str(uuid4())
+            ver_uid = random_uuid()
 
         # Create version resource from copying the current state.
         logger.info(
-            'Creating version snapshot {} for resource {}.'.format(
-                ver_uid, self.uid))
+            'Creating version snapshot %s for resource %s.', ver_uid, self.uid)
         ver_add_gr = set()
         vers_uid = '{}/{}'.format(self.uid, VERS_CONT_LABEL)
         ver_uid = '{}/{}'.format(vers_uid, ver_uid)
-        ver_uri = nsc['fcres'][ver_uid]
-        ver_add_gr.add((ver_uri, RDF.type, nsc['fcrepo'].Version))
-        for t in self.imr:
-            if (
-                t[1] == RDF.type and t[2] in self._ignore_version_types
-            ) or t[1] in self._ignore_version_preds:
-                pass
-            else:
-                ver_add_gr.add((
-                    replace_term_domain(t[0], self.uri, ver_uri),
-                    t[1], t[2]))
+        ver_uri = uid_to_urn(ver_uid)
+        ver_add_gr.add((ver_uri, RDF.type, _FCREPO_VERSION))
+        # Filter out unversioned triples on the graph keys, without a full
+        # intermediate copy of the IMR.
+        ver_gr = self.imr.without_terms(
+                self._ignore_version_preds, self._ignore_version_types)
+        # Only a handful of distinct subjects (the resource and its hash
+        # URIs) are expected, so each one is translated only once.
+        ver_subjects = {}
+        for s, p, o in ver_gr:
+            ver_s = ver_subjects.get(s)
+            if ver_s is None:
+                ver_s = ver_subjects[s] = replace_term_domain(
+                        s, self.uri, ver_uri)
+            ver_add_gr.add((ver_s, p, o))
 
         rdfly.modify_rsrc(ver_uid, add_trp=ver_add_gr)
 
         # Update resource admin data.
         rsrc_add_gr = {
-            (self.uri, nsc['fcrepo'].hasVersion, ver_uri),
-            (self.uri, nsc['fcrepo'].hasVersions, nsc['fcres'][vers_uid]),
+            (self.uri, _FCREPO_HAS_VERSION, ver_uri),
+            (self.uri, _FCREPO_HAS_VERSIONS, uid_to_urn(vers_uid)),
         }
         self.modify(RES_UPDATED, add_trp=rsrc_add_gr)
 
@@ -586,13 +688,12 @@ class Ldpr(metaclass=ABCMeta):
 
         ver_gr = rdfly.get_imr(
             self.uid, ver_uid=ver_uid, incl_children=False)
-        self.provided_imr = Graph(uri=self.uri)
-
-        for t in ver_gr:
-            if not self._is_trp_managed(t):
-                self.provided_imr.add(((self.uri, t[1], t[2]),))
-            # @TODO Check individual objects: if they are repo-managed URIs
-            # and not existing or tombstones, they are not added.
+        # Filter out server-managed triples on the graph keys.
+        ver_gr.remove_terms(srv_mgd_predicates, srv_mgd_types)
+        # @TODO Check individual objects: if they are repo-managed URIs
+        # and not existing or tombstones, they are not added.
+        self.provided_imr = Graph(
+                uri=self.uri, data={(self.uri, p, o) for s, p, o in ver_gr})
 
         return self.create_or_replace(create_only=False)
 
@@ -601,55 +702,50 @@ class Ldpr(metaclass=ABCMeta):
         """
         Check whether server-managed terms are in a RDF payload.
 
-        :param SimpleGraph trp: The graph to validate.
+        :param trp: The triples to validate. In ``lenient`` mode, the
+            offending triples are removed. If ``trp`` is not a
+            :py:class:`Graph`, a filtered copy is returned instead.
+        :type trp: Graph or iterable(tuple)
+
+        :return: The validated triples.
         """
-        offending_subjects = (
-            {t[0] for t in trp if t[0] is not None} & srv_mgd_subjects
-        )
-        if offending_subjects:
-            if self.handling == 'strict':
+        # Collect all the candidate terms in one pass.
+        subjects = set()
+        predicates = set()
+        types = set()
+        for s, p, o in trp:
+            subjects.add(s)
+            predicates.add(p)
+            if p == RDF.type:
+                types.add(o)
+
+        offending_subjects = subjects & srv_mgd_subjects
+        offending_predicates = predicates & srv_mgd_predicates
+        offending_types = types & srv_mgd_types
+        # Allow some types if the resource is being created.
+        if offending_types and not self.is_stored:
+            offending_types -= self.smt_allow_on_create
+
+        if self.handling == 'strict':
+            if offending_subjects:
                 raise ServerManagedTermError(offending_subjects, 's')
-            else:
-                for s in offending_subjects:
-                    logger.info('Removing offending subj: {}'.format(s))
-                    for t in trp:
-                        if t[0] == s:
-                            trp.remove(t)
-
-        offending_predicates = (
-            {t[1] for t in trp if t[1] is not None} & srv_mgd_predicates
-        )
-        # Allow some predicates if the resource is being created.
-        if offending_predicates:
-            if self.handling == 'strict':
+            if offending_predicates:
                 raise ServerManagedTermError(offending_predicates, 'p')
-            else:
-                for p in offending_predicates:
-                    logger.info('Removing offending pred: {}'.format(p))
-                    for t in trp:
-                        if t[1] == p:
-                            trp.remove(t)
-
-        offending_types = (
-            {t[2] for t in trp if t[1] == RDF.type and t[2] is not None}
-            & srv_mgd_types
-        )
-        if not self.is_stored:
-            offending_types -= self.smt_allow_on_create
-        if offending_types:
-            if self.handling == 'strict':
+            if offending_types:
                 raise ServerManagedTermError(offending_types, 't')
-            else:
-                for to in offending_types:
-                    logger.info('Removing offending type: {}'.format(to))
-                    trp.remove_triples((None, RDF.type, to))
+        elif offending_subjects or offending_predicates or offending_types:
+            if not isinstance(trp, Graph):
+                trp = Graph(uri=self.uri, data=set(trp))
+            logger.info(
+                'Removing offending subjects: %s; preds: %s; types: %s',
+                offending_subjects, offending_predicates, offending_types)
+            trp.remove_terms(
+                    offending_predicates, offending_types, offending_subjects)
 
-        #logger.debug('Sanitized graph: {}'.format(trp.serialize(
-        #    format='turtle').decode('utf-8')))
         return trp
 
 
-    def sparql_delta(self, qry_str):
+    def sparql_delta(self, qry_str, bindings=None):
         """
         Calculate the delta obtained by a SPARQL Update operation.
 
@@ -668,42 +764,56 @@ class Ldpr(metaclass=ABCMeta):
         modified. If a server-managed term is present in the query but does not
         cause any change in the updated resource, no error is raised.
 
-        :rtype: tuple(rdflib.Graph)
-        :return: Remove and add graphs. These can be used
+        :param str qry_str: SPARQL Update string. This may be a template with
+            unbound variables that are filled in by ``bindings``.
+        :param dict bindings: Initial variable bindings for the update, as a
+            map of variable names to RDFLib terms. Since parsed updates are
+            cached by query string, reusing the same template with different
+            bindings skips parsing altogether.
+
+        :rtype: tuple
+        :return: Remove and add triple sets or graphs. These can be used
             with ``BaseStoreLayout.update_resource`` and/or recorded as separate
             events in a provenance tracking system.
         """
-        logger.debug('Provided SPARQL query: {}'.format(qry_str))
+        logger.debug('Provided SPARQL query: %s', qry_str)
         # Workaround for RDFLib bug. See
         # https://github.com/RDFLib/rdflib/issues/824
         qry_str = rel_uri_to_urn_string(qry_str, self.uid)
-        pre_gr = self.imr.as_rdflib()
-        post_gr = rdflib.Graph(identifier=self.uri)
-        post_gr |= pre_gr
-
-        post_gr.update(qry_str)
-
-        # FIXME Fix and  use SimpleGraph's native subtraction operation.
-        remove_gr = self.check_mgd_terms(Graph(data=set(pre_gr - post_gr)))
-        add_gr = self.check_mgd_terms(Graph(data=set(post_gr - pre_gr)))
 
-        return remove_gr, add_gr
+        data_upd = None if bindings else _parse_data_update(qry_str)
+        if data_upd is not None:
+            # Ground triples only: the delta is a plain set operation.
+            insert, data_trp = data_upd
+            imr_trp = set(self.imr)
+            if insert:
+                remove_trp, add_trp = set(), data_trp - imr_trp
+            else:
+                remove_trp, add_trp = data_trp & imr_trp, set()
+        else:
+            # The update store records the net changes made by the query, so
+            # the delta does not require diffing the whole resource.
+            delta_store = _DeltaStore()
+            upd_gr = rdflib.Graph(store=delta_store, identifier=self.uri)
+            # Seed the store directly: the IMR terms need no validation.
+            delta_store.addN((s, p, o, upd_gr) for s, p, o in self.imr)
+            delta_store.track = True
+            upd_gr.update(
+                    _parse_update(qry_str), initNs=_update_init_ns,
+                    initBindings=bindings or {})
+            remove_trp, add_trp = delta_store.removed, delta_store.added
+
+        # Graphs are only built if offending triples need to be removed.
+        if remove_trp:
+            remove_trp = self.check_mgd_terms(remove_trp)
+        if add_trp:
+            add_trp = self.check_mgd_terms(add_trp)
+
+        return remove_trp, add_trp
 
 
     ## PROTECTED METHODS ##
 
-    def _is_trp_managed(self, t):
-        """
-        Whether a triple is server-managed.
-
-        :param tuple t: Triple as a 3-tuple of terms.
-
-        :rtype: boolean
-        """
-        return t[1] in srv_mgd_predicates or (
-            t[1] == RDF.type and t[2] in srv_mgd_types)
-
-
     def modify(
             self, ev_type, remove_trp=set(), add_trp=set()):
         """
@@ -722,18 +832,14 @@ class Ldpr(metaclass=ABCMeta):
         """
         rdfly.modify_rsrc(self.uid, remove_trp, add_trp)
 
+        LdpFactory = _ldp_factory()
+        LdpFactory.invalidate(self.uid)
+        # The IMR is reloaded lazily on next access. Callers that use it
+        # outside of this transaction must load it first, as ``get`` does.
         self._clear_cache()
-        # Reload IMR because if we exit the LMDB txn we lose access to stored
-        # memory locations.
-        try:
-            self.imr
-        except:
-            pass
-
-        if (
-                ev_type is not None and
-                env.app_globals.config['application'].get('messaging')):
-            logger.debug(f'Enqueuing message for {self.uid}')
+
+        if ev_type is not None and _messaging:
+            logger.debug('Enqueuing message for %s', self.uid)
             self._enqueue_msg(ev_type, remove_trp, add_trp)
 
 
@@ -751,28 +857,59 @@ class Ldpr(metaclass=ABCMeta):
                 pass
 
 
+    def _forget_imr_derived(self):
+        """
+        Clear cached attributes that may have been derived from the IMR.
+
+        The metadata graph is the IMR itself if the IMR was loaded first, and
+        the RDF types are derived from the metadata.
+        """
+        if getattr(self, '_metadata', None) is self._imr:
+            delattr(self, '_metadata')
+        for attr in ('_types', '_ldp_types', '_is_dc_or_ic'):
+            try:
+                delattr(self, attr)
+            except AttributeError:
+                pass
+
+
     def _enqueue_msg(self, ev_type, remove_trp=None, add_trp=None):
         """
         Compose a message about a resource change.
 
-        The message is enqueued for asynchronous processing.
+        The message is enqueued for asynchronous processing. Within a
+        transaction, it is held in a buffer until the transaction is
+        committed.
 
         :param str ev_type: The event type. See global constants.
-        :param set remove_trp: Triples removed. Only used if the
+        :param set remove_trp: Triples removed.
+        :param set add_trp: Triples added. If the resource does not exist
+            or is a tombstone, the resource types and actor are taken from
+            these.
         """
+        # Triple sets are not modified by the callers after this point, so
+        # they are queued as they are. Graphs are bound to the store
+        # transaction and are copied.
+        if not isinstance(remove_trp, set):
+            remove_trp = set(remove_trp or ())
+        if not isinstance(add_trp, set):
+            add_trp = set(add_trp or ())
+
         try:
             rsrc_type = tuple(str(t) for t in self.types)
-            actor = self.metadata.value(nsc['fcrepo'].createdBy)
+            actor = self.metadata.value(_FCREPO_CREATED_BY)
         except (ResourceNotExistsError, TombstoneError):
             rsrc_type = set()
             actor = None
             for t in add_trp:
                 if t[1] == RDF.type:
                     rsrc_type.add(t[2])
-                elif actor is None and t[1] == nsc['fcrepo'].createdBy:
+                elif actor is None and t[1] == _FCREPO_CREATED_BY:
                     actor = t[2]
 
-        env.app_globals.changelog.append((set(remove_trp), set(add_trp), {
+        changelog = getattr(
+                thread_env, 'changelog_buffer', env.app_globals.changelog)
+        changelog.append((remove_trp, add_trp, {
             'ev_type': ev_type,
             'timestamp': thread_env.timestamp.format(),
             'rsrc_type': rsrc_type,
@@ -788,14 +925,18 @@ class Ldpr(metaclass=ABCMeta):
            :class:`lakesuperior.exceptions.RefIntViolationError` is raised.
            Otherwise, the violation is simply logged.
         """
+        fcres_pfx = _FCRES_PFX
+        self_uri = str(self.uri).rstrip('/')
         remove_set = set()
-        for trp in self.provided_imr:
-            o = trp[2]
-            if(
-                    isinstance(o, URIRef) and
-                    str(o).startswith(nsc['fcres']) and
-                    urldefrag(o).url.rstrip('/') != str(self.uri)):
-                obj_uid = rdfly.uri_to_uid(o)
+        # Each distinct object is only checked once.
+        for o in self.provided_imr.terms_by_type('o'):
+            # URIRef is a str subclass, so no string copy is needed.
+            if not isinstance(o, URIRef) or not o.startswith(fcres_pfx):
+                continue
+            # Hash URIs are checked against the resource they belong to.
+            base_uri = o.partition('#')[0]
+            if base_uri.rstrip('/') != self_uri:
+                obj_uid = base_uri[len(fcres_pfx):]
                 if not rdfly.ask_rsrc_exists(obj_uid):
                     if config == 'strict':
                         raise RefIntViolationError(obj_uid)
@@ -806,8 +947,7 @@ class Ldpr(metaclass=ABCMeta):
         # Remove invalid triples.
         for obj in remove_set:
             logger.info(
-                'Removing link to non-existent repo resource: {}'
-                .format(obj))
+                'Removing link to non-existent repo resource: %s', obj)
             self.provided_imr.remove((None, None, obj))
 
 
@@ -817,29 +957,31 @@ class Ldpr(metaclass=ABCMeta):
 
         :param create: Whether the resource is being created.
         """
+        imr = self.provided_imr
+        ts = thread_env.timestamp_term
+
         # Base LDP types.
-        self.provided_imr.add(
-            [(self.uri, RDF.type, t) for t in self.base_types]
-        )
+        imr.add([(self.uri, RDF.type, t) for t in self.base_types])
 
-        # Create and modify timestamp.
+        # Create and modify timestamp. All values are set in one pass.
         if create:
-            self.provided_imr.set((
-                self.uri, nsc['fcrepo'].created, thread_env.timestamp_term))
-            self.provided_imr.set((
-                self.uri, nsc['fcrepo'].createdBy, self.DEFAULT_USER))
+            srv_mgd_trp = [
+                (self.uri, _FCREPO_CREATED, ts),
+                (self.uri, _FCREPO_CREATED_BY, self.DEFAULT_USER),
+            ]
         else:
-            self.provided_imr.set((
-                self.uri, nsc['fcrepo'].created,
-                self.metadata.value(nsc['fcrepo'].created)))
-            self.provided_imr.set((
-                self.uri, nsc['fcrepo'].createdBy,
-                self.metadata.value(nsc['fcrepo'].createdBy)))
+            metadata = self.metadata
+            srv_mgd_trp = [
+                (self.uri, _FCREPO_CREATED, metadata.value(_FCREPO_CREATED)),
+                (
+                    self.uri, _FCREPO_CREATED_BY,
+                    metadata.value(_FCREPO_CREATED_BY)),
+            ]
+        srv_mgd_trp.append((self.uri, _FCREPO_LAST_MODIFIED, ts))
+        srv_mgd_trp.append(
+                (self.uri, _FCREPO_LAST_MODIFIED_BY, self.DEFAULT_USER))
 
-        self.provided_imr.set((
-            self.uri, nsc['fcrepo'].lastModified, thread_env.timestamp_term))
-        self.provided_imr.set((
-            self.uri, nsc['fcrepo'].lastModifiedBy, self.DEFAULT_USER))
+        imr.set_many(srv_mgd_trp)
 
 
     def _containment_rel(self, create, ignore_type=True):
@@ -867,82 +1009,200 @@ class Ldpr(metaclass=ABCMeta):
         a LDP-NR has "children" under ``fcr:versions``) by setting this to
         True.
         """
-        from lakesuperior.model.ldp.ldp_factory import LdpFactory
+        LdpFactory = _ldp_factory()
 
-        if '/' in self.uid.lstrip('/'):
-            # Traverse up the hierarchy to find the parent.
-            path_components = self.uid.lstrip('/').split('/')
-            cnd_parent_uid = '/' + '/'.join(path_components[:-1])
+        # Path-wise parent, without splitting the whole path.
+        parent_path = self.uid.lstrip('/').rpartition('/')[0]
+        if parent_path:
+            cnd_parent_uid = '/' + parent_path
             if rdfly.ask_rsrc_exists(cnd_parent_uid):
-                parent_rsrc = LdpFactory.from_stored(cnd_parent_uid)
+                parent_rsrc = LdpFactory.from_stored(
+                    cnd_parent_uid, repr_opts={'incl_children': False},
+                    handling='none')
                 if (
                         not ignore_type
-                        and nsc['ldp'].Container not in parent_rsrc.types):
+                        and _LDP_CONTAINER not in parent_rsrc.types):
                     raise InvalidResourceError(
                         cnd_parent_uid, 'Parent {} is not a container.')
-
-                parent_uid = cnd_parent_uid
             else:
-                parent_rsrc = LdpFactory.new_container(cnd_parent_uid)
+                # Existence was checked above within the same transaction.
+                parent_rsrc = LdpFactory.new_container(
+                        cnd_parent_uid, skip_exists_check=True)
                 # This will trigger this method again and recurse until an
                 # existing container or the root node is reached.
+                # The instance is reused as the parent: its cached
+                # attributes are reloaded from the store after the write.
                 parent_rsrc.create_or_replace()
-                parent_uid = parent_rsrc.uid
+                # A container created on the fly is a basic container, so
+                # its metadata need not be loaded to check for DC/IC.
+                parent_rsrc._is_dc_or_ic = False
         else:
-            parent_uid = ROOT_UID
+            parent_rsrc = LdpFactory.from_stored(
+                ROOT_UID, repr_opts={'incl_children': False},
+                handling='none')
 
-        parent_rsrc = LdpFactory.from_stored(
-            parent_uid, repr_opts={'incl_children': False}, handling='none')
+        # Direct or indirect container relationship.
+        add_trp, mbr_trp = self._add_ldp_dc_ic_rel(parent_rsrc)
 
-        # Only update parent if the resource is new.
+        # Only add the containment triple if the resource is new.
+        parent_add_trp = set()
         if create:
-            add_gr = Graph()
-            add_gr.add({
-                (nsc['fcres'][parent_uid], nsc['ldp'].contains, self.uri)
-            })
-            parent_rsrc.modify(RES_UPDATED, add_trp=add_gr)
+            parent_add_trp.add(
+                    (parent_rsrc.uri, _LDP_CONTAINS, self.uri))
+        if mbr_trp is not None:
+            if mbr_trp[0] == parent_rsrc.uri:
+                # The parent is its own membership resource: write both
+                # triples with a single update.
+                parent_add_trp.add(mbr_trp)
+            else:
+                target_rsrc = LdpFactory.from_stored(
+                        rdfly.uri_to_uid(mbr_trp[0]))
+                target_rsrc.modify(RES_UPDATED, add_trp={mbr_trp})
+        if parent_add_trp:
+            parent_rsrc.modify(RES_UPDATED, add_trp=parent_add_trp)
 
-        # Direct or indirect container relationship.
-        return self._add_ldp_dc_ic_rel(parent_rsrc)
+        return add_trp
 
 
     def _add_ldp_dc_ic_rel(self, cont_rsrc):
         """
         Add relationship triples from a parent direct or indirect container.
 
+        No resource is modified by this method. The membership triple is
+        returned for the caller to write along with the other parent updates.
+
         :param rdflib.resource.Resouce cont_rsrc:  The container resource.
+
+        :rtype: tuple
+        :return: Set of triples to add to the current resource, and the
+            membership triple to add to the membership resource, or ``None``
+            if the container is neither direct nor indirect.
         """
         logger.info('Checking direct or indirect containment.')
 
-        add_trp = {(self.uri, nsc['fcrepo'].hasParent, cont_rsrc.uri)}
+        add_trp = {(self.uri, _FCREPO_HAS_PARENT, cont_rsrc.uri)}
+        if not cont_rsrc.is_dc_or_ic:
+            return add_trp, None
 
-        if (
-            nsc['ldp'].DirectContainer in cont_rsrc.ldp_types
-            or nsc['ldp'].IndirectContainer in cont_rsrc.ldp_types
-        ):
-            from lakesuperior.model.ldp.ldp_factory import LdpFactory
+        # Collect all the membership terms in one pass.
+        mbr_rsrc = mbr_rel = cont_rel_uri = None
+        for ts, tp, to in cont_rsrc.metadata:
+            if ts != cont_rsrc.uri:
+                continue
+            if tp == self.MBR_RSRC_URI:
+                mbr_rsrc = to
+            elif tp == self.MBR_REL_URI:
+                mbr_rel = to
+            elif tp == self.INS_CNT_REL_URI:
+                cont_rel_uri = to
+
+        s = mbr_rsrc or cont_rsrc.uri
+        p = mbr_rel or DEF_MBR_REL_URI
+
+        if _LDP_IC in cont_rsrc.ldp_types:
+            logger.info('Parent is an indirect container.')
+            o = (
+                self.provided_imr.value(cont_rel_uri)
+                or DEF_INS_CNT_REL_URI
+            )
+            logger.debug('Target URI: %s', o)
 
-            cont_p = cont_rsrc.metadata.terms_by_type('p')
-            logger.debug('Parent predicates: {}'.format(cont_p))
+        else:
+            logger.info('Parent is a direct container.')
+            o = self.uri
 
-            s = cont_rsrc.metadata.value(self.MBR_RSRC_URI) or cont_rsrc.uri
-            p = cont_rsrc.metadata.value(self.MBR_REL_URI) or DEF_MBR_REL_URI
-            #import pdb; pdb.set_trace()
+        return add_trp, (s, p, o)
 
-            if nsc['ldp'].IndirectContainer in cont_rsrc.ldp_types:
-                logger.info('Parent is an indirect container.')
-                cont_rel_uri = cont_rsrc.metadata.value(self.INS_CNT_REL_URI)
-                o = (
-                    self.provided_imr.value(cont_rel_uri)
-                    or DEF_INS_CNT_REL_URI
-                )
-                logger.debug(f'Target URI: {o}')
 
+@lru_cache(maxsize=512)
+def _parse_update(qry_str):
+    """
+    Parse and translate a SPARQL update string.
+
+    Parsing is the most expensive part of a SPARQL update on a single
+    resource, so the translated algebra is memoized for repeated updates.
+
+    :param str qry_str: SPARQL update string, with relative URIs already
+        resolved.
+
+    :rtype: list
+    """
+    # Building the SPARQL grammar is expensive, so it is only imported by
+    # workers that actually serve SPARQL updates.
+    from rdflib.plugins.sparql.algebra import translateUpdate
+    from rdflib.plugins.sparql.parser import parseUpdate
+
+    return translateUpdate(parseUpdate(qry_str), initNs=_update_init_ns)
+
+
+def _parse_data_update(qry_str):
+    """
+    Parse a SPARQL update made of a single data operation on ground triples.
+
+    This is a shortcut for the common ``INSERT DATA { ... }`` or
+    ``DELETE DATA { ... }`` updates that skips the SPARQL parser if the data
+    block is valid N-Triples.
+
+    :param str qry_str: SPARQL update string, with relative URIs already
+        resolved.
+
+    :rtype: tuple or None
+    :return: Whether the operation is an insert, and the set of triples to
+        insert or delete; or ``None`` if the update must go through the
+        SPARQL parser.
+    """
+    match = _data_update_ptn.match(qry_str)
+    if not match:
+        return None
+
+    parser = NTriplesParser(TripleSetSink())
+    try:
+        parser.parsestring(match.group(2))
+    except ParseError:
+        return None
+
+    triples = parser.sink.triples
+    # Blank nodes follow SPARQL-specific rules.
+    for trp in triples:
+        if isinstance(trp[0], BNode) or isinstance(trp[2], BNode):
+            return None
+
+    return match.group(1).upper() == 'INSERT', triples
+
+
+class _DeltaStore(IOMemory):
+    """
+    RDFLib memory store that keeps track of the net changes made to it.
+
+    Tracking starts when :py:attr:`track` is set to ``True``. From then on,
+    triples that are added and were not in the store yet are recorded in
+    :py:attr:`added`, and existing triples that are removed are recorded in
+    :py:attr:`removed`. A triple removed and added back (or vice versa) is
+    not recorded at all.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.track = False
+        self.added = set()
+        self.removed = set()
+
+
+    def add(self, triple, context, quoted=False):
+        if self.track and next(self.triples(triple, context), None) is None:
+            if triple in self.removed:
+                self.removed.remove(triple)
             else:
-                logger.info('Parent is a direct container.')
-                o = self.uri
+                self.added.add(triple)
 
-            target_rsrc = LdpFactory.from_stored(rdfly.uri_to_uid(s))
-            target_rsrc.modify(RES_UPDATED, add_trp={(s, p, o)})
+        super().add(triple, context, quoted)
 
-        return add_trp
+
+    def remove(self, triplepat, context=None):
+        if self.track:
+            for triple, _ in list(self.triples(triplepat, context)):
+                if triple in self.added:
+                    self.added.remove(triple)
+                else:
+                    self.removed.add(triple)
+
+        super().remove(triplepat, context)
@@ -30,3 +30,4 @@ cdef class Graph:
 
 cdef:
     void add_trp_callback(Graph gr, const TripleKey* spok_p, void* ctx)
+    Key memo_key(Graph gr, term, dict memo) except? 0
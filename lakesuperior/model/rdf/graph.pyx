@@ -1,9 +1,14 @@
 import logging
 
+from io import BytesIO
+
 import rdflib
 
+from rdflib.plugins.parsers.ntriples import NTriplesParser
+
 from lakesuperior import env
 
+from cpython.mem cimport PyMem_Malloc, PyMem_Free
 from cpython.object cimport Py_LT, Py_EQ, Py_GT, Py_LE, Py_NE, Py_GE
 from libc.string cimport memcpy
 from libc.stdlib cimport free
@@ -24,6 +29,11 @@ Graph class and factories.
 
 """
 
+NT_FORMATS = frozenset({
+    'application/n-triples', 'nt', 'nt11', 'ntriples',
+})
+"""Format names that can be parsed by the N-Triples fast path."""
+
 
 cdef class Graph:
     """
@@ -112,9 +122,9 @@ cdef class Graph:
 
         # Initialize empty data set.
         if data:
-            # Populate with provided Python set.
+            # Populate with provided Python set. Its values are unique.
             self.keys = Keyset(len(data))
-            self.add(data)
+            self.add(data, False)
         else:
             self.keys = Keyset(capacity)
 
@@ -383,13 +393,15 @@ cdef class Graph:
         return {r[i] for r in self.data}
 
 
-    def add(self, triples):
+    def add(self, triples, bint check_dup=True):
         """
         Add triples to the graph.
 
-        This method checks for duplicates.
-
         :param iterable triples: iterable of 3-tuple triples.
+        :param bool check_dup: Whether to check for duplicates. Each check
+            scans the whole key set, so for large inputs this should be
+            turned off if the graph is empty and ``triples`` is known to
+            contain unique values (e.g. a ``set`` or a ``rdflib.Graph``).
         """
         cdef:
             TripleKey spok
@@ -402,6 +414,43 @@ cdef class Graph:
                 self.store.to_key(o),
             ]
 
+            self.keys.add(&spok, check_dup)
+
+
+    def add_relative(self, triples, base_uri):
+        """
+        Add triples to the graph, resolving empty URIs against a base URI.
+
+        Subjects and objects that are empty ``URIRef`` instances (``<>``)
+        are replaced with ``base_uri``. This is equivalent to translating
+        each triple with :py:func:`lakesuperior.util.toolbox.rel_uri_to_urn`
+        before calling :py:meth:`add`, but the base URI is hashed only once
+        and no Python function is called per term.
+
+        Term keys are memoized for the duration of the call, since the same
+        subjects and predicates are usually repeated across many triples.
+
+        This method checks for duplicates.
+
+        :param iterable triples: iterable of 3-tuple triples.
+        :param rdflib.URIRef base_uri: URI to replace empty URIs with.
+        """
+        cdef:
+            Key base_key = self.store.to_key(rdflib.URIRef(base_uri))
+            TripleKey spok
+            dict term_keys = {}
+
+        for s, p, o in triples:
+            if isinstance(s, rdflib.URIRef) and not s:
+                spok[0] = base_key
+            else:
+                spok[0] = memo_key(self, s, term_keys)
+            spok[1] = memo_key(self, p, term_keys)
+            if isinstance(o, rdflib.URIRef) and not o:
+                spok[2] = base_key
+            else:
+                spok[2] = memo_key(self, o, term_keys)
+
             self.keys.add(&spok, True)
 
 
@@ -424,6 +473,98 @@ cdef class Graph:
         self.keys = new_gr.keys
 
 
+    def remove_terms(self, preds=(), types=(), subjects=()):
+        """
+        Remove all triples with any of a set of predicates, types or subjects.
+
+        This is equivalent to calling :py:meth:`remove` with a
+        ``(None, p, None)`` pattern for each predicate, a
+        ``(None, rdf:type, t)`` pattern for each type and a
+        ``(s, None, None)`` pattern for each subject, but the key set is
+        scanned only once.
+
+        :param iterable preds: Predicates of the triples to remove.
+        :param iterable types: Objects of the ``rdf:type`` triples to remove.
+        :param iterable subjects: Subjects of the triples to remove.
+        """
+        self.keys = self.without_terms(preds, types, subjects).keys
+
+
+    def without_terms(self, preds=(), types=(), subjects=()):
+        """
+        Copy the graph leaving out triples with any of a set of predicates,
+        types or subjects.
+
+        This is the non-destructive version of :py:meth:`remove_terms`. The
+        copy is built in a single scan of the key set.
+
+        :param iterable preds: Predicates of the triples to leave out.
+        :param iterable types: Objects of the ``rdf:type`` triples to leave
+            out.
+        :param iterable subjects: Subjects of the triples to leave out.
+
+        :rtype: Graph
+        """
+        cdef:
+            size_t i, npk, nok, nsk
+            Key type_pk
+            Key* pks
+            Key* oks
+            Key* sks
+            TripleKey spok
+            bint keep
+            Graph new_gr
+
+        pk_list = [self.store.to_key(p) for p in preds]
+        ok_list = [self.store.to_key(t) for t in types]
+        sk_list = [self.store.to_key(s) for s in subjects]
+        npk = len(pk_list)
+        nok = len(ok_list)
+        nsk = len(sk_list)
+        if not npk and not nok and not nsk:
+            return self.copy()
+
+        type_pk = self.store.to_key(rdflib.RDF.type)
+        pks = <Key*>PyMem_Malloc((npk + nok + nsk) * sizeof(Key))
+        if not pks:
+            raise MemoryError('Error allocating term keys.')
+        oks = pks + npk
+        sks = oks + nok
+
+        try:
+            for i in range(npk):
+                pks[i] = pk_list[i]
+            for i in range(nok):
+                oks[i] = ok_list[i]
+            for i in range(nsk):
+                sks[i] = sk_list[i]
+
+            new_gr = self.empty_copy()
+            self.keys.seek()
+            while self.keys.get_next(&spok):
+                keep = True
+                for i in range(nsk):
+                    if spok[0] == sks[i]:
+                        keep = False
+                        break
+                if keep:
+                    for i in range(npk):
+                        if spok[1] == pks[i]:
+                            keep = False
+                            break
+                if keep and spok[1] == type_pk:
+                    for i in range(nok):
+                        if spok[2] == oks[i]:
+                            keep = False
+                            break
+                if keep:
+                    new_gr.keys.add(&spok)
+        finally:
+            PyMem_Free(pks)
+
+        return new_gr
+
+
     ## CYTHON-ACCESSIBLE BASIC METHODS ##
 
     cpdef Graph copy(self, str uri=None):
@@ -462,6 +603,61 @@ cdef class Graph:
         self.add((trp,))
 
 
+    def set_many(self, triples):
+        """
+        Set single values for several subject and predicate pairs.
+
+        This is equivalent to calling :py:meth:`set` for each triple, but the
+        key set is scanned only once. Triples sharing the same subject and
+        predicate are all kept.
+
+        :param iterable triples: 3-tuple triples.
+        """
+        cdef:
+            size_t i, n
+            Key* sps
+            TripleKey spok
+            bint keep
+            Graph new_gr
+
+        trp_list = list(triples)
+        for trp in trp_list:
+            if None in trp:
+                raise ValueError(f'Invalid triple: {trp}')
+        n = len(trp_list)
+        if not n:
+            return
+
+        sp_list = [
+            (self.store.to_key(trp[0]), self.store.to_key(trp[1]))
+            for trp in trp_list
+        ]
+        sps = <Key*>PyMem_Malloc(2 * n * sizeof(Key))
+        if not sps:
+            raise MemoryError('Error allocating term keys.')
+
+        try:
+            for i in range(n):
+                sps[2 * i] = sp_list[i][0]
+                sps[2 * i + 1] = sp_list[i][1]
+
+            new_gr = self.empty_copy()
+            self.keys.seek()
+            while self.keys.get_next(&spok):
+                keep = True
+                for i in range(n):
+                    if spok[0] == sps[2 * i] and spok[1] == sps[2 * i + 1]:
+                        keep = False
+                        break
+                if keep:
+                    new_gr.keys.add(&spok)
+        finally:
+            PyMem_Free(sps)
+
+        self.keys = new_gr.keys
+        self.add(trp_list)
+
+
     def as_rdflib(self):
         """
         Return the data set as an RDFLib Graph.
@@ -641,9 +837,36 @@ def from_rdf(store=None, uri=None, *args, **kwargs):
     :rtype: Graph
 
     """
-    gr = rdflib.Graph().parse(*args, **kwargs)
+    if not args and kwargs.get('format') in NT_FORMATS and (
+            kwargs.get('data') is not None):
+        # N-Triples have no prefixes or relative URIs to resolve, so they
+        # can be streamed into a set without building an RDFLib graph.
+        data = kwargs['data']
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        sink = NTriplesParser(TripleSetSink()).parse(BytesIO(data))
+
+        return Graph(store=store, uri=uri, data=sink.triples)
+
+    rdf_gr = rdflib.Graph().parse(*args, **kwargs)
+
+    # Add the parsed triples directly, without an intermediate set.
+    gr = Graph(store=store, capacity=len(rdf_gr), uri=uri)
+    gr.add(rdf_gr, False)
+
+    return gr
+
+
+class TripleSetSink:
+    """
+    N-Triples parser sink that collects triples in a set.
+    """
+    def __init__(self):
+        self.triples = set()
 
-    return Graph(store=store, uri=uri, data={*gr})
+
+    def triple(self, s, p, o):
+        self.triples.add((s, p, o))
 
 
 ## LOOKUP CALLBACK FUNCTIONS
@@ -659,3 +882,23 @@ cdef inline void add_trp_callback(
     :param void* ctx: Not used.
     """
     gr.keys.add(spok_p)
+
+
+## HELPER FUNCTIONS
+
+cdef inline Key memo_key(Graph gr, term, dict memo) except? 0:
+    """
+    Get the store key for a term, looking it up in a memo first.
+
+    :param Graph gr: Graph whose store the key is retrieved from.
+    :param rdflib.term.Identifier term: Term to look up.
+    :param dict memo: Term to key map. It is updated with the looked up
+        term if not found.
+
+    :rtype: Key
+    """
+    k = memo.get(term)
+    if k is None:
+        k = memo[term] = gr.store.to_key(term)
+
+    return k
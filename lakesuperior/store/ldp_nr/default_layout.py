@@ -29,7 +29,7 @@ class DefaultLayout(BaseNonRdfLayout):
         :param str uuid: The resource UUID. This corresponds to the content
             checksum.
         """
-        logger.debug('Generating path from uuid: {}'.format(uuid))
+        logger.debug('Generating path from uuid: %s', uuid)
         term = len(uuid) if bc == 0 else min(bc * bl, len(uuid))
 
         path = [uuid[i : i + bl] for i in range(0, term, bl)]
@@ -95,7 +95,7 @@ class DefaultLayout(BaseNonRdfLayout):
             prov_cksum_algo = default_hash_algo
         try:
             with open(tmp_fname, 'wb') as f:
-                logger.debug(f'Writing temp file to {tmp_fname}.')
+                logger.debug('Writing temp file to %s.', tmp_fname)
 
                 store_hash = hashlib.new(default_hash_algo)
                 try:
@@ -121,7 +121,7 @@ class DefaultLayout(BaseNonRdfLayout):
                     raise ChecksumValidationError(
                         uid, prov_cksum, verify_hash.hexdigest())
         except:
-            logger.exception(f'File write failed on {tmp_fname}.')
+            logger.exception('File write failed on %s.', tmp_fname)
             os.unlink(tmp_fname)
             raise
         if size == 0:
@@ -131,10 +131,10 @@ class DefaultLayout(BaseNonRdfLayout):
         dst = __class__.local_path(
                 self.root, store_hash.hexdigest(), self.bl, self.bc)
         if os.path.exists(dst):
-            logger.info(f'File exists on {dst}. Not overwriting.')
+            logger.info('File exists on %s. Not overwriting.', dst)
 
         # Move temp file to final destination.
-        logger.debug(f'Saving file to disk: {dst}')
+        logger.debug('Saving file to disk: %s', dst)
         if not os.access(os.path.dirname(dst), os.X_OK):
             os.makedirs(os.path.dirname(dst))
         os.rename(tmp_fname, dst)
@@ -1,7 +1,9 @@
 cimport lakesuperior.cy_include.collections as cc
 cimport lakesuperior.cy_include.cylmdb as lmdb
 
-from lakesuperior.model.base cimport Key, DoubleKey, TripleKey, Buffer
+from lakesuperior.model.base cimport (
+    Key, DoubleKey, TripleKey, QuadKey, Buffer
+)
 from lakesuperior.model.rdf.graph cimport Graph
 from lakesuperior.model.structures.keyset cimport Keyset
 from lakesuperior.store.base_lmdb_store cimport DbLabel, BaseLmdbStore
@@ -23,6 +25,7 @@ cdef class LmdbTriplestore(BaseLmdbStore):
     cpdef dict stats(self)
     cpdef size_t _len(self, context=*) except -1
     cpdef void add(self, triple, context=*, quoted=*) except *
+    cpdef void add_triples(self, triples, context=*) except *
     cpdef void add_graph(self, graph) except *
     cpdef void _remove(self, tuple triple_pattern, context=*) except *
     cpdef void _remove_graph(self, object gr_uri) except *
@@ -30,6 +33,7 @@ cdef class LmdbTriplestore(BaseLmdbStore):
     cpdef Graph triple_keys(self, tuple triple_pattern, context=*, uri=*)
 
     cdef:
+        void _add_quad(self, QuadKey spock) except *
         void _index_triple(self, int op, TripleKey spok) except *
         void _all_term_keys(self, term_type, cc.HashSet** tkeys) except *
         void lookup_term(self, const Key tk, Buffer* data) except *
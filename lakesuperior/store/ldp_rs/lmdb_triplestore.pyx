@@ -220,7 +220,7 @@ cdef class LmdbTriplestore(BaseLmdbStore):
         """
         cdef:
             lmdb.MDB_cursor *icur
-            lmdb.MDB_val spo_v, c_v, null_v, key_v, data_v
+            lmdb.MDB_val key_v, data_v
             unsigned char i
             Hash128 thash
             QuadKey spock
@@ -259,6 +259,51 @@ cdef class LmdbTriplestore(BaseLmdbStore):
         finally:
             self._cur_close(icur)
 
+        self._add_quad(spock)
+
+
+    cpdef void add_triples(self, triples, context=None) except *:
+        """
+        Add a batch of triples to a single context.
+
+        This is equivalent to calling :py:meth:`add` for each triple, but the
+        context is looked up only once, and term keys are memoized for the
+        duration of the call, since the triples of a resource usually share
+        subjects and predicates.
+
+        :param iterable triples: Iterable of 3-tuples of identifiers.
+        :param context: Context identifier. See :py:meth:`add`.
+        """
+        cdef:
+            unsigned char i
+            QuadKey spock
+            dict term_keys = {}
+
+        c = self._normalize_context(context)
+        if c is None:
+            c = RDFLIB_DEFAULT_GRAPH_URI
+        spock[3] = self.to_key(c)
+
+        for trp in triples:
+            for i in range(3):
+                term_obj = trp[i]
+                tk = term_keys.get(term_obj)
+                if tk is None:
+                    tk = term_keys[term_obj] = self.to_key(term_obj)
+                spock[i] = tk
+
+            self._add_quad(spock)
+
+
+    cdef void _add_quad(self, QuadKey spock) except *:
+        """
+        Add a triple to a context and index it, by their keys.
+
+        :param QuadKey spock: Subject, predicate, object and context keys.
+            All the keys must already exist in the term store.
+        """
+        cdef lmdb.MDB_val spo_v, c_v, null_v
+
         spo_v.mv_data = spock # address of sk in spock
         spo_v.mv_size = TRP_KLEN # Grab 3 keys
         c_v.mv_data = spock + 3 # address of ck in spock
@@ -1,7 +1,6 @@
 import logging
 
 from collections import defaultdict
-from hashlib import sha256
 from itertools import chain
 from os import path
 from string import Template
@@ -16,7 +15,7 @@ from rdflib.query import ResultException
 from rdflib.resource import Resource
 from rdflib.store import Store
 
-from lakesuperior import basedir, env
+from lakesuperior import basedir, thread_env
 from lakesuperior.dictionaries.namespaces import ns_collection as nsc
 from lakesuperior.dictionaries.namespaces import ns_mgr as nsm
 from lakesuperior.dictionaries.srv_mgd_terms import  srv_mgd_subjects, \
@@ -25,7 +24,7 @@ from lakesuperior.globals import ROOT_RSRC_URI
 from lakesuperior.exceptions import (InvalidResourceError,
         ResourceNotExistsError, TombstoneError, PathSegmentError)
 from lakesuperior.model.rdf.graph import Graph
-from lakesuperior.util.toolbox import get_tree_size
+from lakesuperior.util.toolbox import get_tree_size, uid_to_urn
 
 
 META_GR_URI = nsc['fcsystem']['meta']
@@ -33,6 +32,12 @@ HIST_GR_URI = nsc['fcsystem']['histmeta']
 PTREE_GR_URI = nsc['fcsystem']['pairtree']
 VERS_CONT_LABEL = 'fcr:versions'
 
+# Terms used for every changed triple or graph, built once.
+_FCMAIN = nsc['fcmain']
+_FCRES = nsc['fcres']
+_PRIMARY_TOPIC = nsc['foaf'].primaryTopic
+_CREATED = nsc['fcrepo'].created
+
 Lmdb = plugin.register('Lmdb', Store,
         'lakesuperior.store.ldp_rs.lmdb_store', 'LmdbStore')
 logger = logging.getLogger(__name__)
@@ -292,7 +297,7 @@ class RsrcCentricLayout:
         if not incl_children:
             contexts.remove(nsc['fcstruct'][uid])
 
-        imr = Graph(self.store, uri=nsc['fcres'][uid])
+        imr = Graph(self.store, uri=uid_to_urn(uid))
 
         for ctx in contexts:
             gr = self.store.triple_keys((None, None, None), ctx)
@@ -301,7 +306,7 @@ class RsrcCentricLayout:
         # Include inbound relationships.
         if incl_inbound and len(imr):
             gr = Graph(
-                self.store, data={*self.get_inbound_rel(nsc['fcres'][uid])}
+                self.store, data={*self.get_inbound_rel(uid_to_urn(uid))}
             )
             imr |= gr
 
@@ -314,31 +319,42 @@ class RsrcCentricLayout:
     def ask_rsrc_exists(self, uid):
         """
         See base_rdf_layout.ask_rsrc_exists.
+
+        Within a transaction, the result is cached until the resource is
+        modified or deleted.
         """
-        logger.debug('Checking if resource exists: {}'.format(uid))
-        #import pdb; pdb.set_trace()
+        cache = getattr(thread_env, 'exists_cache', None)
+        if cache is not None and uid in cache:
+            return cache[uid]
+
+        logger.debug('Checking if resource exists: %s', uid)
         res = self.store.triples(
-            (nsc['fcres'][uid], RDF.type, nsc['fcrepo'].Resource),
+            (uid_to_urn(uid), RDF.type, nsc['fcrepo'].Resource),
             nsc['fcadmin'][uid])
         try:
             next(res)
         except StopIteration:
-            return False
+            exists = False
         else:
-            return True
+            exists = True
+
+        if cache is not None:
+            cache[uid] = exists
+
+        return exists
 
 
     def get_metadata(self, uid, ver_uid=None, strict=True):
         """
         This is an optimized query to get only the administrative metadata.
         """
-        logger.debug('Getting metadata for: {}'.format(uid))
+        logger.debug('Getting metadata for: %s', uid)
         if ver_uid:
             uid = self.snapshot_uid(uid, ver_uid)
         imr = self.store.triple_keys(
             (None, None, None),
             context=nsc['fcadmin'][uid],
-            uri=nsc['fcres'][uid]
+            uri=uid_to_urn(uid)
         )
 
         if strict:
@@ -357,7 +373,7 @@ class RsrcCentricLayout:
         # *TODO* This only works as long as there is only one user-provided
         # graph. If multiple user-provided graphs will be supported, this
         # should use another query to get all of them.
-        uri = nsc['fcres'][uid]
+        uri = uid_to_urn(uid)
         userdata = self.store.triple_keys(
             (None, None, None),
             context=nsc['fcmain'][uid],
@@ -378,11 +394,11 @@ class RsrcCentricLayout:
         # URI with the subject URI. But the concepts of data and metadata in
         # Fedora are quite fluid anyways...
 
-        vmeta = Graph(self.store, uri=nsc['fcres'][uid])
+        vmeta = Graph(self.store, uri=uid_to_urn(uid))
 
         #Get version graphs proper.
         for vtrp in self.store.triple_keys(
-            (nsc['fcres'][uid], nsc['fcrepo'].hasVersion, None),
+            (uid_to_urn(uid), nsc['fcrepo'].hasVersion, None),
             nsc['fcadmin'][uid]
         ):
             # Add the hasVersion triple to the result graph.
@@ -439,37 +455,30 @@ class RsrcCentricLayout:
         :rtype: Iterator(rdflib.URIRef)
         :return: Subjects of descendant resources.
         """
-        #import pdb; pdb.set_trace()
-        #ds = self.ds
-        subj_uri = nsc['fcres'][uid]
+        subj_uri = uid_to_urn(uid)
         ctx_uri = nsc['fcstruct'][uid]
         cont_p = nsc['ldp'].contains
-        def _recurse(dset, s, c):
-            new_dset = self.store.triple_keys(
-                (s, cont_p, None), c
-            )[s : cont_p]
-            #new_dset = set(ds.graph(c)[s : cont_p])
-            for ss in new_dset:
-                dset.add(ss)
-                cc = URIRef(ss.replace(nsc['fcres'], nsc['fcstruct']))
-                sub_dset = self.store.triples((ss, cont_p, None), cc)
-                #if set(ds.graph(cc)[ss : cont_p]):
-                try:
-                    next(sub_dset)
-                except StopIteration:
-                    pass
-                else:
-                    _recurse(dset, ss, cc)
-            return dset
-
-        if recurse:
-            return _recurse(set(), subj_uri, ctx_uri)
-        else:
-            #return ds.graph(ctx_uri)[subj_uri : cont_p : ])
+
+        if not recurse:
             return self.store.triple_keys(
                 (subj_uri, cont_p, None), ctx_uri
             )[subj_uri : cont_p]
 
+        # Walk the containment tree iteratively, with one indexed lookup per
+        # container, rather than recursing.
+        dset = set()
+        stack = [(subj_uri, ctx_uri)]
+        while stack:
+            s, c = stack.pop()
+            for ss in self.store.triple_keys((s, cont_p, None), c)[s : cont_p]:
+                if ss in dset:
+                    continue
+                dset.add(ss)
+                stack.append(
+                    (ss, URIRef(ss.replace(_FCRES, nsc['fcstruct']))))
+
+        return dset
+
 
     def get_last_version_uid(self, uid):
         """
@@ -500,7 +509,7 @@ class RsrcCentricLayout:
         # it's simple and harmless to add here.
         self.store.add(
                 (nsc['fcmain'][uid], nsc['foaf'].primaryTopic,
-                nsc['fcres'][uid]), META_GR_URI)
+                uid_to_urn(uid)), META_GR_URI)
         gr = self.ds.graph(nsc['fcmain'][uid])
         #logger.debug('Updating graph {} with statements: {}'.format(
         #    nsc['fcmain'][uid], qry))
@@ -516,7 +525,7 @@ class RsrcCentricLayout:
         NOTE: inbound references in historic versions are not affected.
         """
         # Localize variables to be used in loops.
-        uri = nsc['fcres'][uid]
+        uri = uid_to_urn(uid)
         uid_fn = self.uri_to_uid
 
         # remove children and descendants.
@@ -559,6 +568,7 @@ class RsrcCentricLayout:
         indicated by the term router. It also adds metadata about the changed
         graphs.
         """
+        self._forget_exists(uid)
         remove_routes = defaultdict(set)
         add_routes = defaultdict(set)
         historic = VERS_CONT_LABEL in uid
@@ -586,17 +596,18 @@ class RsrcCentricLayout:
         #import pdb; pdb.set_trace()
         for gr_uri, triples in remove_routes.items():
             for trp in triples:
-                logger.debug('Removing triple: {}'.format(trp))
+                logger.debug('Removing triple: %s', trp)
                 self.store.remove(trp, gr_uri)
+        ts = getattr(thread_env, 'timestamp_term', None)
+        if ts is None:
+            ts = Literal(arrow.utcnow())
+        subj_uri = uid_to_urn(uid)
         for gr_uri, triples in add_routes.items():
-            for trp in triples:
-                logger.debug('Adding triple: {}'.format(trp))
-                self.store.add(trp, gr_uri)
+            logger.debug('Adding %d triples to %s.', len(triples), gr_uri)
+            self.store.add_triples(triples, gr_uri)
             # Add metadata.
-            meta_gr.set(
-                    (gr_uri, nsc['foaf'].primaryTopic, nsc['fcres'][uid]))
-            ts = getattr(env, 'timestamp_term', Literal(arrow.utcnow()))
-            meta_gr.set((gr_uri, nsc['fcrepo'].created, ts))
+            meta_gr.set((gr_uri, _PRIMARY_TOPIC, subj_uri))
+            meta_gr.set((gr_uri, _CREATED, ts))
             if historic:
                 # @FIXME Ugly reverse engineering.
                 ver_uid = uid.split(VERS_CONT_LABEL)[1].lstrip('/')
@@ -617,9 +628,10 @@ class RsrcCentricLayout:
         :param uid: Resource UID.
         :param bool historic: Whether the UID is of a historic version.
         """
+        self._forget_exists(uid)
         meta_gr_uri = HIST_GR_URI if historic else META_GR_URI
         for gr_uri in self.ds.graph(meta_gr_uri)[
-                : nsc['foaf'].primaryTopic : nsc['fcres'][uid]]:
+                : nsc['foaf'].primaryTopic : uid_to_urn(uid)]:
             self.ds.remove_context(gr_uri)
             self.ds.graph(meta_gr_uri).remove((gr_uri, None, None))
 
@@ -639,7 +651,7 @@ class RsrcCentricLayout:
         """
         Convert an internal URI to a UID.
         """
-        return str(uri).replace(nsc['fcres'], '')
+        return str(uri).replace(_FCRES, '')
 
 
     def find_refint_violations(self):
@@ -673,6 +685,17 @@ class RsrcCentricLayout:
 
     ## PROTECTED MEMBERS ##
 
+    def _forget_exists(self, uid):
+        """
+        Drop a resource from the transaction-scoped existence cache.
+
+        :param str uid: Resource UID.
+        """
+        cache = getattr(thread_env, 'exists_cache', None)
+        if cache is not None:
+            cache.pop(uid, None)
+
+
     def _check_rsrc_status(self, imr):
         """
         Check if a resource is not existing or if it is a tombstone.
@@ -699,11 +722,10 @@ class RsrcCentricLayout:
         :rtype: tuple
         :return: 2-tuple with a graph URI and an associated RDF type.
         """
-        if t[1] in self.attr_routes['p'].keys():
-            pfx = self.attr_routes['p'][t[1]]
-        elif t[1] == RDF.type and t[2] in self.attr_routes['t'].keys():
-            pfx = self.attr_routes['t'][t[2]]
-        else:
-            pfx = nsc['fcmain']
+        pfx = self.attr_routes['p'].get(t[1])
+        if pfx is None and t[1] == RDF.type:
+            pfx = self.attr_routes['t'].get(t[2])
+        if pfx is None:
+            pfx = _FCMAIN
 
         return (pfx[uid], self.graph_ns_types[pfx])
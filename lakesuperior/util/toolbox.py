@@ -3,7 +3,9 @@ import os
 import re
 
 from collections import defaultdict
-from hashlib import sha1
+from datetime import timezone
+from email.utils import format_datetime
+from functools import lru_cache
 
 from rdflib import Graph
 from rdflib.term import URIRef, Variable
@@ -16,6 +18,14 @@ logger = logging.getLogger(__name__)
 
 __doc__ = ''' Utility to translate and generate strings and other objects. '''
 
+_rel_frag_uri_ptn = re.compile('<#([^>]+)>')
+"""Relative URI with a fragment, e.g. ``<#hash01>``."""
+_loc_rel_uri_ptn = re.compile(r'<([#?].*?)?>')
+"""Empty URI, optionally followed by a query string or fragment."""
+_loc_root_uri_ptn = re.compile(r'<{}([#?].*?)?>'.format(nsc['fcres']))
+"""Internal URN of the root resource, optionally followed by a query string
+or fragment."""
+
 
 def fsize_fmt(num, suffix='b'):
     """
@@ -108,6 +118,43 @@ def parse_rfc7240(h_str):
     return parsed_hdr
 
 
+@lru_cache(maxsize=1024)
+def http_date(term):
+    """
+    Format a ``xsd:dateTime`` literal as a HTTP header date.
+
+    The same timestamps are formatted over and over for resources that are
+    read more often than they are updated, so the formatted values are
+    memoized.
+
+    :param rdflib.Literal term: Timestamp literal, e.g. the value of
+        ``fcrepo:lastModified``. A timestamp without an offset is taken as
+        UTC.
+
+    :rtype: str
+    """
+    dt = term.toPython()
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+
+    return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
+
+
+@lru_cache(maxsize=64)
+def ldp_type_link(rdf_type):
+    """
+    Format a LDP type as a ``Link`` header value.
+
+    There are only a handful of LDP types, so the formatted values are
+    memoized.
+
+    :param rdflib.URIRef rdf_type: LDP type URI.
+
+    :rtype: str
+    """
+    return f'<{rdf_type}>;rel="type"'
+
+
 def split_uuid(uuid):
     '''
     Split a UID into pairtree segments. This mimics FCREPO4 behavior.
@@ -121,6 +168,40 @@ def split_uuid(uuid):
 
     return path
 
+
+def random_uuid():
+    """
+    Generate a random (version 4) UUID string.
+
+    The output is the same as ``str(uuid.uuid4())``, but it is built directly
+    from random bytes without instantiating a ``UUID`` object.
+
+    :rtype: str
+    """
+    b = bytearray(os.urandom(16))
+    # Set the version (4) and variant (RFC 4122) bits.
+    b[6] = b[6] & 0x0f | 0x40
+    b[8] = b[8] & 0x3f | 0x80
+    h = b.hex()
+
+    return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+
+@lru_cache(maxsize=4096)
+def uid_to_urn(uid):
+    """
+    Convert a resource UID to its internal URN.
+
+    The result is memoized, so that repeated conversions of the same UID
+    return the same ``URIRef`` instance, whose string hash is computed once.
+
+    :param str uid: Resource UID.
+
+    :rtype: URIRef
+    """
+    return nsc['fcres'][uid]
+
+
 def rel_uri_to_urn(uri, uid):
     """
     Convert a URIRef with a relative location (e.g. ``<>``) to an URN.
@@ -134,7 +215,7 @@ def rel_uri_to_urn(uri, uid):
     :rtype: URIRef
     """
     # FIXME This only accounts for empty URIs, not all relative URIs.
-    return nsc['fcres'][uid] if str(uri) == '' else uri
+    return uid_to_urn(uid) if str(uri) == '' else uri
     #return URIRef(
     #        re.sub('<#([^>]+)>', f'<{base_uri}#\\1>', str(uri))
     #        .replace('<>', f'<{base_uri}>'))
@@ -150,10 +231,11 @@ def rel_uri_to_urn_string(string, uid):
     :rtype: str
     :return: Modified string.
     """
-    urn = str(nsc['fcres'][uid])
-    return (
-        re.sub('<#([^>]+)>', f'<{urn}#\\1>', string).replace('<>', f'<{urn}>')
-    )
+    urn = str(uid_to_urn(uid))
+    if '<#' in string:
+        string = _rel_frag_uri_ptn.sub(f'<{urn}#\\1>', string)
+
+    return string.replace('<>', f'<{urn}>')
 
 
 class RequestUtils:
@@ -275,13 +357,11 @@ class RequestUtils:
         loc_sub1 = '<{}/\\1>'.format(nsc['fcres'])
         s1 = re.sub(loc_ptn1, loc_sub1, s)
 
-        loc_ptn2 = r'<([#?].*?)?>'
         loc_sub2 = '<{}\\1>'.format(urn)
-        s2 = re.sub(loc_ptn2, loc_sub2, s1)
+        s2 = _loc_rel_uri_ptn.sub(loc_sub2, s1)
 
-        loc_ptn3 = r'<{}([#?].*?)?>'.format(nsc['fcres'])
         loc_sub3 = '<{}\\1>'.format(ROOT_RSRC_URI)
-        s3 = re.sub(loc_ptn3, loc_sub3, s2)
+        s3 = _loc_root_uri_ptn.sub(loc_sub3, s2)
 
         return s3
 
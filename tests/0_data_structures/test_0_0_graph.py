@@ -5,7 +5,7 @@ from shutil import rmtree
 
 from rdflib import Graph, Namespace, URIRef
 
-from lakesuperior.model.rdf.graph import Graph
+from lakesuperior.model.rdf.graph import Graph, from_rdf
 from lakesuperior.store.ldp_rs.lmdb_store import LmdbStore
 
 
@@ -70,6 +70,20 @@ class TestGraphInit:
                 assert t in gr
 
 
+    def test_init_nt(self, trp, store):
+        """
+        Test creation from N-Triples data.
+        """
+        data = ''.join(f'<{s}> <{p}> <{o}> .\n' for s, p, o in trp)
+        with store.txn_ctx():
+            gr = from_rdf(store=store, data=data, format='nt')
+
+            assert len(gr) == 6
+
+            for t in trp:
+                assert t in gr
+
+
 @pytest.mark.usefixtures('trp')
 @pytest.mark.usefixtures('store')
 class TestGraphLookup:
@@ -325,6 +339,26 @@ class TestGraphOps:
             assert trp[2] not in gr
 
 
+    def test_add_relative(self, trp, store):
+        """
+        Test adding triples with relative URIs.
+        """
+        base_uri = URIRef('urn:s:base')
+        with store.txn_ctx():
+            gr = Graph(store)
+
+            gr.add_relative((
+                (URIRef(''), trp[0][1], trp[0][2]),
+                (trp[0][0], trp[0][1], URIRef('')),
+                trp[5],
+            ), base_uri)
+
+            assert len(gr) == 3
+            assert (base_uri, trp[0][1], trp[0][2]) in gr
+            assert (trp[0][0], trp[0][1], base_uri) in gr
+            assert trp[5] in gr
+
+
     def test_remove(self, trp, store):
         """
         Test adding and removing triples.
@@ -350,6 +384,90 @@ class TestGraphOps:
             assert len(gr) == 3
 
 
+    def test_remove_terms(self, trp, store):
+        """
+        Test removing triples by predicates and types.
+        """
+        rdf_type = URIRef('http://www.w3.org/1999/02/22-rdf-syntax-ns#type')
+        type_trp = (
+            (URIRef('urn:s:0'), rdf_type, URIRef('urn:t:0')),
+            (URIRef('urn:s:1'), rdf_type, URIRef('urn:t:1')),
+        )
+        with store.txn_ctx():
+            gr = Graph(store, data={*trp, *type_trp})
+
+            gr.remove_terms((URIRef('urn:p:0'),), (URIRef('urn:t:0'),))
+            assert len(gr) == 5
+            assert trp[0] not in gr
+            assert trp[2] not in gr
+            assert type_trp[0] not in gr
+            assert type_trp[1] in gr
+            assert trp[3] in gr
+
+            # No terms: nothing is removed.
+            gr.remove_terms()
+            assert len(gr) == 5
+
+
+    def test_without_terms(self, trp, store):
+        """
+        Test copying a graph without a set of predicates or types.
+        """
+        rdf_type = URIRef('http://www.w3.org/1999/02/22-rdf-syntax-ns#type')
+        type_trp = (
+            (URIRef('urn:s:0'), rdf_type, URIRef('urn:t:0')),
+            (URIRef('urn:s:1'), rdf_type, URIRef('urn:t:1')),
+        )
+        with store.txn_ctx():
+            gr = Graph(store, data={*trp, *type_trp})
+
+            gr2 = gr.without_terms(
+                    (URIRef('urn:p:0'),), (URIRef('urn:t:0'),))
+            assert len(gr2) == 5
+            assert trp[0] not in gr2
+            assert type_trp[0] not in gr2
+            assert type_trp[1] in gr2
+            # The original graph is untouched.
+            assert len(gr) == 8
+            assert trp[0] in gr
+
+            assert set(gr.without_terms()) == set(gr)
+
+            gr3 = gr.without_terms(subjects=(URIRef('urn:s:1'),))
+            assert len(gr3) == 5
+            assert trp[5] not in gr3
+            assert type_trp[1] not in gr3
+            assert type_trp[0] in gr3
+
+
+    def test_set_many(self, trp, store):
+        """
+        Test setting values for several subject and predicate pairs.
+        """
+        with store.txn_ctx():
+            gr = Graph(store, data={*trp})
+
+            gr.set_many((
+                (URIRef('urn:s:0'), URIRef('urn:p:1'), URIRef('urn:o:2')),
+                (URIRef('urn:s:1'), URIRef('urn:p:2'), URIRef('urn:o:0')),
+            ))
+            assert len(gr) == 5
+            assert (
+                URIRef('urn:s:0'), URIRef('urn:p:1'), URIRef('urn:o:2')
+            ) in gr
+            assert (
+                URIRef('urn:s:1'), URIRef('urn:p:2'), URIRef('urn:o:0')
+            ) in gr
+            assert trp[3] not in gr
+            assert trp[4] not in gr
+            assert trp[6] not in gr
+            assert trp[0] in gr
+            assert trp[5] in gr
+
+            with pytest.raises(ValueError):
+                gr.set_many(((URIRef('urn:s:0'), URIRef('urn:p:0'), None),))
+
+
     def test_union(self, trp, store):
         """
         Test graph union.
@@ -930,6 +930,25 @@ class TestContext:
             assert len(set(store.triples(trp3))) == 1
 
 
+    def test_add_triples_to_ctx(self, store):
+        """
+        Add a batch of triples sharing terms to a context.
+        """
+        s = URIRef('urn:bogus:batch_s:1')
+        trp1 = (s, URIRef('urn:bogus:batch_p:1'), URIRef('urn:bogus:batch_o:1'))
+        trp2 = (s, URIRef('urn:bogus:batch_p:1'), URIRef('urn:bogus:batch_o:2'))
+        trp3 = (s, URIRef('urn:bogus:batch_p:2'), URIRef('urn:bogus:batch_o:1'))
+        ctx = URIRef('urn:bogus:batch_graph#a')
+
+        with store.txn_ctx(True):
+            store.add_triples({trp1, trp2, trp3}, ctx)
+
+        with store.txn_ctx():
+            assert _clean(store.triples((s, None, None), ctx)) == {
+                    trp1, trp2, trp3}
+            assert ctx in store.contexts(trp2)
+
+
 #@pytest.mark.usefixtures('store')
 #class TestRdflib:
 #    '''
@@ -13,6 +13,7 @@ from lakesuperior.exceptions import (
         IncompatibleLdpTypeError, InvalidResourceError, ResourceNotExistsError,
         TombstoneError)
 from lakesuperior.globals import RES_CREATED, RES_UPDATED
+from lakesuperior.model.ldp.ldp_factory import LdpFactory
 from lakesuperior.model.ldp.ldpr import Ldpr
 from lakesuperior.model.rdf.graph import Graph, from_rdf
 
@@ -270,6 +271,35 @@ class TestResourceCRUD:
                 rsrc.uri : nsc['foaf'].name : Literal('Joe 12oz Bob')]
 
 
+    def test_delta_update_overlap(self):
+        """
+        Update a resource with a triple both removed and added.
+        """
+        uid = '/test_delta_patch_overlap'
+        uri = nsc['fcres'][uid]
+        init_trp = {
+            (URIRef(uri), nsc['rdf'].type, nsc['foaf'].Person),
+        }
+        remove_trp = {
+            (URIRef(uri), nsc['rdf'].type, nsc['foaf'].Person),
+            (URIRef(uri), nsc['foaf'].name, Literal('Joe Bob')),
+        }
+        add_trp = {
+            (URIRef(uri), nsc['foaf'].name, Literal('Joe Bob')),
+        }
+
+        with env.app_globals.rdf_store.txn_ctx():
+            gr = Graph(data=init_trp)
+        rsrc_api.create_or_replace(uid, graph=gr)
+        rsrc_api.update_delta(uid, remove_trp, add_trp)
+        rsrc = rsrc_api.get(uid)
+
+        with env.app_globals.rdf_store.txn_ctx():
+            assert rsrc.imr[rsrc.uri : nsc['foaf'].name : Literal('Joe Bob')]
+            assert not rsrc.imr[
+                    rsrc.uri : nsc['rdf'].type : nsc['foaf'].Person]
+
+
     def test_sparql_update(self):
         """
         Update a resource using a SPARQL Update string.
@@ -307,6 +337,95 @@ class TestResourceCRUD:
                 in set(rsrc.imr))
 
 
+    def test_sparql_update_bindings(self):
+        """
+        Update a resource using a SPARQL Update template and bindings.
+        """
+        uid = '/test_sparql_bindings'
+        update_tpl = '''DELETE {
+        <> <http://purl.org/dc/terms/title> ?old .
+        } INSERT {
+        <> <http://purl.org/dc/terms/title> ?new .
+        } WHERE {
+        }'''
+        rsrc_api.create_or_replace(uid)
+
+        for old, new in (('', 'Title #1.'), ('Title #1.', 'Title #2.')):
+            rsrc = rsrc_api.update(uid, update_tpl, bindings={
+                'old': Literal(old), 'new': Literal(new)})
+        with env.app_globals.rdf_store.txn_ctx():
+            assert (
+                (rsrc.uri, nsc['dcterms'].title, Literal('Title #1.'))
+                not in set(rsrc.imr))
+            assert (
+                (rsrc.uri, nsc['dcterms'].title, Literal('Title #2.'))
+                in set(rsrc.imr))
+
+
+    def test_sparql_update_data(self):
+        """
+        Update a resource using ``INSERT DATA`` and ``DELETE DATA``.
+        """
+        uid = '/test_sparql_data'
+        rdf_data = b'<> <http://purl.org/dc/terms/title> "Original title." .'
+        rsrc_api.create_or_replace(uid, rdf_data=rdf_data, rdf_fmt='turtle')
+
+        rsrc_api.update(uid, '''INSERT DATA {
+        <> <http://purl.org/dc/terms/title> "Title #2." .
+        }''')
+        rsrc = rsrc_api.update(uid, '''DELETE DATA {
+        <> <http://purl.org/dc/terms/title> "Original title." .
+        }''')
+        with env.app_globals.rdf_store.txn_ctx():
+            assert (
+                (rsrc.uri, nsc['dcterms'].title, Literal('Original title.'))
+                not in set(rsrc.imr))
+            assert (
+                (rsrc.uri, nsc['dcterms'].title, Literal('Title #2.'))
+                in set(rsrc.imr))
+
+
+    def test_sparql_update_many(self):
+        """
+        Update multiple resources in a single transaction.
+        """
+        uids = ('/test_sparql_many1', '/test_sparql_many2')
+        for uid in uids:
+            rsrc_api.create_or_replace(uid)
+
+        rsrcs = rsrc_api.update_many(
+            (uid, f'INSERT DATA {{ <> <{nsc["dcterms"].title}> "{uid}" . }}')
+            for uid in uids)
+        assert len(rsrcs) == 2
+        with env.app_globals.rdf_store.txn_ctx():
+            for uid, rsrc in zip(uids, rsrcs):
+                assert rsrc.uid == uid
+                assert (
+                    (rsrc.uri, nsc['dcterms'].title, Literal(uid))
+                    in set(rsrc.imr))
+
+
+    def test_from_stored_many_repr_opts(self):
+        """
+        Retrieve multiple resources with non-default representation options.
+
+        Non-existing resources are skipped.
+        """
+        uid = '/test_from_stored_many'
+        child_uid = f'{uid}/child'
+        rsrc_api.create_or_replace(uid)
+        rsrc_api.create_or_replace(child_uid)
+
+        repr_opts = {'incl_children': False}
+        with env.app_globals.rdf_store.txn_ctx():
+            rsrcs = list(LdpFactory.from_stored_many(
+                    (uid, '/{}'.format(uuid4())), repr_opts=repr_opts))
+            assert len(rsrcs) == 1
+            assert rsrcs[0]._imr_options == repr_opts
+            assert not rsrcs[0].imr[
+                rsrcs[0].uri : nsc['ldp'].contains : nsc['fcres'][child_uid]]
+
+
     def test_create_ldp_dc_post(self, dc_rdf):
         """
         Create an LDP Direct Container via POST.
@@ -744,6 +863,30 @@ class TestAdvancedDelete:
                 rsrc_api.resurrect('{}/child{}'.format(uid, i))
 
 
+    def test_delete_descendants_tombstone(self):
+        """
+        Soft-delete a resource with children and grandchildren.
+
+        All descendants point to the tombstone of the deleted resource.
+        """
+        uid = '/test_soft_delete_descendants01'
+        child_uid = f'{uid}/child'
+        grandchild_uid = f'{child_uid}/grandchild'
+        rsrc_api.create_or_replace(uid)
+        rsrc_api.create_or_replace(child_uid)
+        rsrc_api.create_or_replace(grandchild_uid)
+        rsrc_api.delete(uid)
+
+        with pytest.raises(TombstoneError) as exc_info:
+            rsrc_api.get(uid)
+        assert exc_info.value.uid == uid
+
+        for desc_uid in child_uid, grandchild_uid:
+            with pytest.raises(TombstoneError) as exc_info:
+                rsrc_api.get(desc_uid)
+            assert exc_info.value.uid == uid
+
+
     def test_resurrect_children(self):
         """
         Resurrect a resource with its children.
@@ -1,9 +1,13 @@
 import pytest
 
+from uuid import UUID
+
 from flask import g
-from rdflib.term import URIRef
+from rdflib.namespace import XSD
+from rdflib.term import Literal, URIRef
 
 from lakesuperior.dictionaries.namespaces import ns_collection as nsc
+from lakesuperior.util.toolbox import http_date, ldp_type_link, random_uuid
 
 @pytest.fixture
 def app_ctx(client):
@@ -26,6 +30,39 @@ class TestToolbox:
     #    assert g.tbox.camelcase('_test_input_string') == '_TestInputString'
     #    assert g.tbox.camelcase('test__input__string') == 'Test_Input_String'
 
+    def test_random_uuid(self):
+        '''
+        Test random UUID generation.
+        '''
+        uuid = random_uuid()
+        assert str(UUID(uuid)) == uuid
+        assert UUID(uuid).version == 4
+        assert random_uuid() != uuid
+
+
+    def test_http_date(self):
+        '''
+        Test formatting a timestamp literal as a HTTP date.
+        '''
+        ts = Literal('2018-04-03T05:20:33.774746+00:00', datatype=XSD.dateTime)
+        assert http_date(ts) == 'Tue, 03 Apr 2018 05:20:33 GMT'
+
+        ts = Literal('2018-04-03T07:20:33.774746+02:00', datatype=XSD.dateTime)
+        assert http_date(ts) == 'Tue, 03 Apr 2018 05:20:33 GMT'
+
+        # No offset: UTC is assumed, regardless of the server time zone.
+        ts = Literal('2018-04-03T05:20:33.774746', datatype=XSD.dateTime)
+        assert http_date(ts) == 'Tue, 03 Apr 2018 05:20:33 GMT'
+
+
+    def test_ldp_type_link(self):
+        '''
+        Test formatting a LDP type as a Link header value.
+        '''
+        assert ldp_type_link(nsc['ldp'].Resource) == (
+                '<http://www.w3.org/ns/ldp#Resource>;rel="type"')
+
+
     def test_uid_to_uri(self):
         assert g.tbox.uid_to_uri('/1234') == URIRef(g.webroot + '/1234')
         assert g.tbox.uid_to_uri('/1/2/34') == URIRef(g.webroot + '/1/2/34')